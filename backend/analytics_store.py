@@ -0,0 +1,141 @@
+"""
+Process-local columnar transaction store for analytics.
+
+Each active user's transactions are loaded once with a single projected
+query into compact NumPy columns and then kept current with append/delete
+deltas from the transaction write paths. Entries are tagged with the user's
+data version so writes made by other API processes trigger a reload; while
+Redis is unreachable that cannot be checked, so nothing is cached. Cached
+loads always read the primary, since a lagging replica would store stale
+rows under the current version.
+Memory is bounded by an LRU over users on the total number of rows held.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+from sqlalchemy import BigInteger, cast, func
+from sqlalchemy.orm import Session
+from execution.columnar import Columns
+from . import models, database, data_version
+
+MAX_ROWS = int(os.getenv("ANALYTICS_STORE_MAX_ROWS", "5000000"))
+
+# user_id -> [columns, (user version, global version)]
+_entries: "OrderedDict[int, list]" = OrderedDict()
+_rows_held = 0
+_lock = threading.Lock()
+
+def _load(db: Session, user_id: int) -> Columns:
+    rows = db.query(
+        models.Transaction.id,
+        cast(func.round(models.Transaction.amount * 100), BigInteger),
+        models.Transaction.date,
+        models.Transaction.category_id
+    ).filter(
+        models.Transaction.user_id == user_id
+    ).all()
+    return Columns.from_rows(rows)
+
+def _drop(user_id: int):
+    global _rows_held
+    entry = _entries.pop(user_id, None)
+    if entry:
+        _rows_held -= len(entry[0])
+
+def get_columns(db: Session, user_id: int) -> Columns:
+    """
+    Returns the user's columns, loading them if absent or stale.
+    """
+    global _rows_held
+    versions = data_version.current_versions(user_id)
+    if versions is None:
+        # Writes from other API processes cannot be detected without Redis
+        with _lock:
+            _drop(user_id)
+        return _load(db, user_id)
+    with _lock:
+        entry = _entries.get(user_id)
+        if entry and entry[1] == versions:
+            _entries.move_to_end(user_id)
+            # Snapshot: deltas replace the arrays rather than mutating them
+            columns = entry[0]
+            return Columns(columns.ids, columns.cents, columns.days, columns.category_ids)
+
+    if database.is_replica(db):
+        with database.SessionLocal() as primary:
+            columns = _load(primary, user_id)
+    else:
+        columns = _load(db, user_id)
+    with _lock:
+        _drop(user_id)
+        _entries[user_id] = [columns, versions]
+        _rows_held += len(columns)
+        while _rows_held > MAX_ROWS and len(_entries) > 1:
+            _drop(next(iter(_entries)))
+    return columns
+
+def _apply(user_id: int, version: Optional[int], change) -> None:
+    with _lock:
+        entry = _entries.get(user_id)
+        if not entry:
+            return
+        # The delta is only safe if no other writer got in between
+        if version is None or entry[1][0] + 1 != version or not change(entry[0]):
+            _drop(user_id)
+            return
+        entry[1] = (version, entry[1][1])
+
+def _to_columns(transactions: List[models.Transaction]) -> Columns:
+    return Columns.from_rows([
+        (t.id if t.id is not None else -1, round(float(t.amount) * 100), t.date, t.category_id)
+        for t in transactions
+    ])
+
+def append(user_id: int, transactions: List[models.Transaction], version: Optional[int]):
+    """
+    Applies new transactions to a loaded user. Rows without an id yet (bulk
+    inserts) are held as -1 and force a reload if later deleted.
+    """
+    delta = _to_columns(transactions)
+
+    def change(columns: Columns) -> bool:
+        global _rows_held
+        columns.append(delta)
+        _rows_held += len(delta)
+        return True
+
+    _apply(user_id, version, change)
+
+def delete(user_id: int, transaction_id: int, version: Optional[int]):
+    """
+    Removes a deleted transaction from a loaded user.
+    """
+    def change(columns: Columns) -> bool:
+        global _rows_held
+        if not columns.delete(transaction_id):
+            return False
+        _rows_held -= 1
+        return True
+
+    _apply(user_id, version, change)
+
+def replace(user_id: int, transaction: models.Transaction, version: Optional[int]):
+    """
+    Applies an edited transaction to a loaded user.
+    """
+    delta = _to_columns([transaction])
+
+    def change(columns: Columns) -> bool:
+        if not columns.delete(transaction.id):
+            return False
+        columns.append(delta)
+        return True
+
+    _apply(user_id, version, change)
+
+def touch(user_id: int, version: Optional[int]):
+    """
+    Records a write that leaves transaction rows unchanged (categories, budgets).
+    """
+    _apply(user_id, version, lambda columns: True)
@@ -0,0 +1,192 @@
+"""
+Spending anomaly detection.
+
+Per-user, per-category running mean/variance (Welford) is kept in
+CategoryStats and updated in O(1) from the transaction write paths, so
+scoring new charges never needs to rescan history.
+"""
+from datetime import date, timedelta
+from typing import List, Optional
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from execution.rolling_stats import welford_add, welford_remove, combine, grouped_stats, variance
+from . import models
+
+Z_THRESHOLD = 3.0
+MIN_SAMPLES = 5
+WINDOW_DAYS = 30
+
+def _lock_stats(db: Session, user_id: int, category_ids: List[int]) -> dict:
+    """
+    Returns {category_id: CategoryStats}, creating missing rows, with the rows
+    locked until the caller commits so concurrent writers to the same
+    category serialize instead of losing updates.
+    """
+    category_ids = sorted(set(category_ids))
+    query = db.query(models.CategoryStats).filter(
+        models.CategoryStats.user_id == user_id,
+        models.CategoryStats.category_id.in_(category_ids)
+    )
+    present = {category_id for category_id, in query.with_entities(models.CategoryStats.category_id)}
+    for category_id in category_ids:
+        if category_id in present:
+            continue
+        try:
+            # A concurrent first insert of the same row wins; its row is locked below
+            with db.begin_nested():
+                db.add(models.CategoryStats(user_id=user_id, category_id=category_id, count=0, mean=0.0, m2=0.0))
+        except IntegrityError:
+            pass
+    # Consistent lock order so writers touching several categories cannot deadlock
+    locked = query.order_by(models.CategoryStats.category_id).with_for_update().populate_existing()
+    return {stats.category_id: stats for stats in locked}
+
+def record_transaction(db: Session, transaction: models.Transaction):
+    """
+    Adds a transaction to its category's running statistics. Caller commits.
+    """
+    stats = _lock_stats(db, transaction.user_id, [transaction.category_id])[transaction.category_id]
+    stats.count, stats.mean, stats.m2 = welford_add(stats.count, stats.mean, stats.m2, float(transaction.amount))
+
+def remove_transaction(db: Session, transaction: models.Transaction):
+    """
+    Removes a deleted transaction from its category's running statistics. Caller commits.
+    """
+    stats = _lock_stats(db, transaction.user_id, [transaction.category_id])[transaction.category_id]
+    stats.count, stats.mean, stats.m2 = welford_remove(stats.count, stats.mean, stats.m2, float(transaction.amount))
+
+def move_transaction(db: Session, transaction: models.Transaction, category_id: int):
+    """
+    Recategorizes a transaction and moves it between the categories' running
+    statistics, locking both rows in id order. Caller commits.
+    """
+    stats = _lock_stats(db, transaction.user_id, [transaction.category_id, category_id])
+    amount = float(transaction.amount)
+    old, new = stats[transaction.category_id], stats[category_id]
+    old.count, old.mean, old.m2 = welford_remove(old.count, old.mean, old.m2, amount)
+    new.count, new.mean, new.m2 = welford_add(new.count, new.mean, new.m2, amount)
+    transaction.category_id = category_id
+
+def record_batch(db: Session, user_id: int, transactions: List[models.Transaction]):
+    """
+    Folds a batch of new transactions into the running statistics with one
+    grouped pass and one merge per touched category. Caller commits.
+    """
+    if not transactions:
+        return
+    category_ids = np.array([t.category_id for t in transactions], dtype=np.int64)
+    amounts = np.array([float(t.amount) for t in transactions], dtype=np.float64)
+    uniques, codes = np.unique(category_ids, return_inverse=True)
+    counts, means, m2 = grouped_stats(codes, amounts, len(uniques))
+
+    locked = _lock_stats(db, user_id, uniques.tolist())
+    for i, category_id in enumerate(uniques.tolist()):
+        stats = locked[category_id]
+        count, mean, m2_total = combine(stats.count, stats.mean, stats.m2, int(counts[i]), means[i], m2[i])
+        stats.count, stats.mean, stats.m2 = int(count), float(mean), float(m2_total)
+
+def rebuild_stats(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recomputes the statistics from scratch with a vectorized grouped pass.
+    Returns the number of (user, category) groups written.
+    """
+    query = db.query(
+        models.Transaction.user_id,
+        models.Transaction.category_id,
+        models.Transaction.amount
+    )
+    stale = db.query(models.CategoryStats)
+    if user_id is not None:
+        query = query.filter(models.Transaction.user_id == user_id)
+        stale = stale.filter(models.CategoryStats.user_id == user_id)
+    rows = query.all()
+
+    stale.delete(synchronize_session=False)
+    written = 0
+    if rows:
+        keys = (np.array([r.user_id for r in rows], dtype=np.int64) << 32) | np.array([r.category_id for r in rows], dtype=np.int64)
+        amounts = np.array([r.amount for r in rows], dtype=np.float64)
+        uniques, codes = np.unique(keys, return_inverse=True)
+        counts, means, m2 = grouped_stats(codes, amounts, len(uniques))
+        db.bulk_insert_mappings(models.CategoryStats, [
+            {
+                "user_id": int(key >> 32),
+                "category_id": int(key & 0xFFFFFFFF),
+                "count": int(counts[i]),
+                "mean": float(means[i]),
+                "m2": float(m2[i])
+            } for i, key in enumerate(uniques.tolist())
+        ])
+        written = len(uniques)
+    db.commit()
+    return written
+
+def find_anomalies(db: Session, user_id: int, threshold: float = Z_THRESHOLD, days: int = WINDOW_DAYS) -> dict:
+    """
+    Scores the last `days` of transactions against the stored statistics.
+    Returns single-charge z-score outliers and categories whose recent mean
+    charge is a spike relative to its history.
+    """
+    stats = db.query(models.CategoryStats).filter(models.CategoryStats.user_id == user_id).all()
+    baseline = {
+        s.category_id: (s.mean, np.sqrt(variance(s.count, s.m2)))
+        for s in stats if s.count >= MIN_SAMPLES
+    }
+
+    recent = db.query(
+        models.Transaction.id,
+        models.Transaction.category_id,
+        models.Category.name,
+        models.Transaction.amount,
+        models.Transaction.date,
+        models.Transaction.description
+    ).join(
+        models.Category, models.Transaction.category_id == models.Category.id
+    ).filter(
+        models.Transaction.user_id == user_id,
+        models.Transaction.date >= date.today() - timedelta(days=days)
+    ).all()
+    recent = [r for r in recent if r.category_id in baseline and baseline[r.category_id][1] > 0]
+    if not recent:
+        return {"charges": [], "categories": []}
+
+    amounts = np.array([r.amount for r in recent], dtype=np.float64)
+    means = np.array([baseline[r.category_id][0] for r in recent])
+    stds = np.array([baseline[r.category_id][1] for r in recent])
+    z = (amounts - means) / stds
+
+    charges = [
+        {
+            "id": r.id,
+            "date": r.date,
+            "description": r.description,
+            "category": r.name,
+            "amount": float(amounts[i]),
+            "expected": float(means[i]),
+            "z_score": float(z[i])
+        } for i, r in enumerate(recent) if abs(z[i]) > threshold
+    ]
+
+    # Category spikes: z-score of the window's mean charge (standard error of the mean)
+    uniques, codes = np.unique([r.category_id for r in recent], return_inverse=True)
+    counts, window_means, _ = grouped_stats(codes, amounts, len(uniques))
+    names = {r.category_id: r.name for r in recent}
+    categories = []
+    for i, category_id in enumerate(uniques.tolist()):
+        mean, std = baseline[category_id]
+        score = (window_means[i] - mean) / (std / np.sqrt(counts[i]))
+        if abs(score) > threshold:
+            categories.append({
+                "category": names[category_id],
+                "transactions": int(counts[i]),
+                "window_total": float(window_means[i] * counts[i]),
+                "window_mean": float(window_means[i]),
+                "expected_mean": float(mean),
+                "z_score": float(score)
+            })
+
+    return {
+        "charges": sorted(charges, key=lambda c: -abs(c["z_score"])),
+        "categories": sorted(categories, key=lambda c: -abs(c["z_score"]))
+    }
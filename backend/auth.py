@@ -3,7 +3,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from . import database, models
@@ -35,6 +35,32 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def get_token_user_id(token: str) -> Optional[int]:
+    """
+    Reads the user id claim without a database lookup. None for invalid or
+    older tokens that predate the claim.
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("uid")
+
+def get_read_db(response: Response, token: str = Depends(oauth2_scheme)):
+    """
+    Read-only session for analytics and reports, routed to a replica unless
+    the user wrote recently. A replica may not have caught up with the data
+    version in the ETag set by conditional_get, so replica-served responses
+    carry no ETag.
+    """
+    db = database.read_session(get_token_user_id(token))
+    if database.is_replica(db) and "etag" in response.headers:
+        del response.headers["etag"]
+    try:
+        yield db
+    finally:
+        db.close()
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,120 @@
+"""
+Learned transaction categorization.
+
+A per-user linear model over hashed character n-grams is trained from the
+transactions the user categorized themselves (never from keyword or model
+assignments, which would reinforce its own mistakes) and used for upload
+rows the keyword rules miss. Models live on disk and in a process-local LRU
+cache bounded by model size.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Set
+import joblib
+import numpy as np
+from sqlalchemy.orm import Session
+from execution.categorize_model import fit_full, fit_incremental, predict, model_nbytes
+from . import models
+
+MODEL_DIR = os.getenv("CATEGORIZER_MODEL_DIR", ".tmp/models")
+CACHE_BYTES = int(os.getenv("CATEGORIZER_CACHE_BYTES", str(256 * 1024 * 1024)))
+MIN_CONFIDENCE = float(os.getenv("CATEGORIZER_MIN_CONFIDENCE", "0.6"))
+
+# user_id -> (file mtime, bundle, bytes); bundle = {"model": ..., "last_id": ...}
+_cache: "OrderedDict[int, tuple]" = OrderedDict()
+_cache_bytes = 0
+_lock = threading.Lock()
+
+def _model_path(user_id: int) -> str:
+    return os.path.join(MODEL_DIR, f"categorizer_{user_id}.joblib")
+
+def load_model(user_id: int) -> Optional[dict]:
+    """
+    Returns the user's model bundle, reloading it when the worker has
+    written a newer one and evicting the least recently used users once
+    CACHE_BYTES of model weights are held. Blocking: call off the event loop.
+    """
+    global _cache_bytes
+    path = _model_path(user_id)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    with _lock:
+        entry = _cache.get(user_id)
+        if entry and entry[0] == mtime:
+            _cache.move_to_end(user_id)
+            return entry[1]
+
+    bundle = joblib.load(path)
+    size = model_nbytes(bundle["model"])
+    with _lock:
+        old = _cache.pop(user_id, None)
+        if old:
+            _cache_bytes -= old[2]
+        _cache[user_id] = (mtime, bundle, size)
+        _cache_bytes += size
+        while _cache_bytes > CACHE_BYTES and len(_cache) > 1:
+            _cache_bytes -= _cache.popitem(last=False)[1][2]
+    return bundle
+
+def _save_model(user_id: int, bundle: dict):
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    path = _model_path(user_id)
+    joblib.dump(bundle, f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+
+def _labelled(db: Session, user_id: int, after_id: int = 0):
+    return db.query(
+        models.Transaction.id,
+        models.Transaction.description,
+        models.Transaction.category_id
+    ).join(
+        models.Category, models.Transaction.category_id == models.Category.id
+    ).filter(
+        models.Transaction.user_id == user_id,
+        models.Transaction.id > after_id,
+        models.Transaction.category_source == "user",
+        models.Transaction.description.isnot(None),
+        models.Category.name != "Uncategorized"
+    ).order_by(models.Transaction.id).all()
+
+def train_user_model(db: Session, user_id: int) -> dict:
+    """
+    Folds transactions the user categorized since the last run into their model.
+    Unseen categories force a full refit since partial_fit cannot add classes.
+    """
+    bundle = load_model(user_id)
+    rows = _labelled(db, user_id, bundle["last_id"] if bundle else 0)
+    if not rows:
+        return {"trained": 0}
+
+    labels = np.array([r.category_id for r in rows])
+    if bundle and set(labels.tolist()) <= set(bundle["model"].classes_.tolist()):
+        model = fit_incremental(bundle["model"], [r.description for r in rows], labels)
+    else:
+        rows = _labelled(db, user_id)
+        labels = np.array([r.category_id for r in rows])
+        if len(set(labels.tolist())) < 2:
+            return {"trained": 0}
+        model = fit_full([r.description for r in rows], labels)
+
+    _save_model(user_id, {"model": model, "last_id": rows[-1].id})
+    return {"trained": len(rows), "classes": len(model.classes_)}
+
+def predict_categories(user_id: int, descriptions: List[str], valid_ids: Set[int]) -> List[Optional[int]]:
+    """
+    Predicts categories for a whole batch in one call. Returns None where the
+    user has no model, confidence is low or the category no longer exists.
+    """
+    bundle = load_model(user_id)
+    if bundle is None or not descriptions:
+        return [None] * len(descriptions)
+
+    labels, confident = predict(bundle["model"], descriptions, MIN_CONFIDENCE)
+    return [
+        int(label) if ok and int(label) in valid_ids else None
+        for label, ok in zip(labels.tolist(), confident.tolist())
+    ]
@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -18,4 +19,10 @@ celery_app.conf.update(
     result_serializer='json',
     timezone='UTC',
     enable_utc=True,
+    beat_schedule={
+        "maintain-transaction-partitions": {
+            "task": "maintain_transaction_partitions",
+            "schedule": crontab(hour=3, minute=0),
+        },
+    },
 )
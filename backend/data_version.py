@@ -0,0 +1,101 @@
+"""
+Per-user data versions for conditional GETs.
+
+Write handlers bump the user's version in Redis; read endpoints derive a
+weak ETag from that version and the request, so a matching If-None-Match is
+answered with 304 before any SQL or pandas work runs.
+"""
+import hashlib
+import os
+import time
+from datetime import date
+from typing import Optional, Tuple
+import redis
+from fastapi import Depends, HTTPException, Request, Response
+from . import auth, database
+from .celery_app import REDIS_URL
+
+_client = redis.Redis.from_url(REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+# After a failure Redis is skipped for this long instead of timing out on every request
+REDIS_RETRY_SECONDS = float(os.getenv("REDIS_RETRY_SECONDS", "5"))
+_redis_down_until = 0.0
+# Set when a command failed, so version bumps may have been lost
+_redis_failed = False
+
+GLOBAL_KEY = "data_version:global"
+
+def _redis(command: str, *args):
+    """
+    Runs a Redis command, returning None on failure or while backing off.
+    The first command after a failure first bumps the global version: bumps
+    skipped meanwhile (here or in other processes) would otherwise let
+    clients revalidate reads older than those writes.
+    """
+    global _redis_down_until, _redis_failed
+    if _redis_down_until > time.monotonic():
+        return None
+    try:
+        if _redis_failed:
+            _client.incr(GLOBAL_KEY)
+            _redis_failed = False
+        return getattr(_client, command)(*args)
+    except redis.RedisError:
+        _redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        _redis_failed = True
+        return None
+
+def _user_key(user_id: int) -> str:
+    return f"data_version:user:{user_id}"
+
+def bump_version(user_id: int) -> Optional[int]:
+    """
+    Invalidates every cached read of this user. Call after committing a write.
+    Returns the new version, or None if Redis is unreachable; the missed bump
+    is then covered by the global bump once Redis answers again.
+    """
+    database.mark_write(user_id)
+    return _redis("incr", _user_key(user_id))
+
+def current_versions(user_id: int) -> Optional[Tuple[int, int]]:
+    """
+    Returns (user version, global version), or None if Redis is unreachable.
+    """
+    values = _redis("mget", _user_key(user_id), GLOBAL_KEY)
+    if values is None:
+        return None
+    user_version, global_version = values
+    return int(user_version or 0), int(global_version or 0)
+
+def bump_all():
+    """
+    Invalidates cached reads of every user, e.g. after a batch job.
+    """
+    _redis("incr", GLOBAL_KEY)
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+async def conditional_get(request: Request, response: Response, token: str = Depends(auth.oauth2_scheme)):
+    """
+    Route dependency: sets an ETag for the current user's data version and
+    short-circuits with 304 when the client already holds it. Tokens without
+    a user id claim, or an unreachable Redis, simply skip caching.
+    """
+    user_id = auth.get_token_user_id(token)
+    if user_id is None:
+        return
+    versions = current_versions(user_id)
+    if versions is None:
+        return
+
+    # Today's date keeps endpoints that default to the current month fresh
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    fingerprint = f"{user_id}:{versions[0]}:{versions[1]}:{date.today()}:{request.url.path}?{query}"
+    etag = f'W/"{hashlib.sha1(fingerprint.encode()).hexdigest()[:20]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
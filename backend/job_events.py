@@ -0,0 +1,189 @@
+"""
+Push-based Celery job status.
+
+Workers publish task state and progress events from Celery signals. Each API
+process runs one shared subscriber that fans events out to in-memory queues
+of the SSE clients listening on that task, so an idle listener costs a queue
+and a keepalive rather than a result backend query per poll.
+
+JOB_EVENTS_BACKEND=memory replaces Redis pub/sub with in-process delivery,
+for use with Celery eager mode in tests and local runs.
+"""
+import asyncio
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+import redis
+import redis.asyncio as aioredis
+from celery.result import AsyncResult
+from .celery_app import REDIS_URL, celery_app
+
+JOB_EVENTS_BACKEND = os.getenv("JOB_EVENTS_BACKEND", "redis")  # 'redis' or 'memory'
+CHANNEL = "job_events"
+KEEPALIVE_SECONDS = 15
+LAST_EVENTS_SIZE = 10000
+TERMINAL_STATES = {"SUCCESS", "FAILURE", "REVOKED"}
+
+_publisher = redis.Redis.from_url(REDIS_URL)
+
+def _jsonable(value):
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return str(value)
+
+def publish(task_id: str, state: str, result=None, progress: Optional[dict] = None):
+    """
+    Publishes a task event. Safe to call from worker processes and threads.
+    """
+    event = {"task_id": task_id, "task_status": state, "result": _jsonable(result), "progress": progress}
+    if JOB_EVENTS_BACKEND == "memory":
+        hub.dispatch_threadsafe(event)
+        return
+    try:
+        _publisher.publish(CHANNEL, json.dumps(event))
+    except redis.RedisError:
+        pass
+
+class EventHub:
+    """
+    Per-process fan-out of job events to listener queues keyed by task id.
+    """
+    def __init__(self):
+        self._listeners = {}
+        self._last = OrderedDict()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscriber: Optional[asyncio.Task] = None
+
+    def dispatch(self, event: dict):
+        task_id = event["task_id"]
+        with self._lock:
+            self._last[task_id] = event
+            self._last.move_to_end(task_id)
+            while len(self._last) > LAST_EVENTS_SIZE:
+                self._last.popitem(last=False)
+            queues = list(self._listeners.get(task_id, ()))
+        for queue in queues:
+            queue.put_nowait(event)
+
+    def dispatch_threadsafe(self, event: dict):
+        loop = self._loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if loop is not None and running is not loop and loop.is_running():
+            loop.call_soon_threadsafe(self.dispatch, event)
+        else:
+            self.dispatch(event)
+
+    def last_event(self, task_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._last.get(task_id)
+
+    def listen(self, task_id: str) -> asyncio.Queue:
+        self._ensure_started()
+        queue = asyncio.Queue()
+        with self._lock:
+            self._listeners.setdefault(task_id, set()).add(queue)
+        return queue
+
+    def unlisten(self, task_id: str, queue: asyncio.Queue):
+        with self._lock:
+            queues = self._listeners.get(task_id)
+            if queues:
+                queues.discard(queue)
+                if not queues:
+                    del self._listeners[task_id]
+
+    def _resync(self):
+        # Events published while nothing was subscribed are lost; a None
+        # tells each listener to re-check the result backend
+        with self._lock:
+            queues = [queue for queues in self._listeners.values() for queue in queues]
+        for queue in queues:
+            queue.put_nowait(None)
+
+    def _ensure_started(self):
+        self._loop = asyncio.get_running_loop()
+        if JOB_EVENTS_BACKEND != "memory" and (self._subscriber is None or self._subscriber.done()):
+            self._subscriber = self._loop.create_task(self._subscribe())
+
+    async def _subscribe(self):
+        # One Redis subscription per API process, reconnecting on failure
+        while True:
+            try:
+                client = aioredis.from_url(REDIS_URL)
+                pubsub = client.pubsub()
+                await pubsub.subscribe(CHANNEL)
+                self._resync()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.dispatch(json.loads(message["data"]))
+            except (redis.RedisError, OSError):
+                await asyncio.sleep(1)
+
+hub = EventHub()
+
+def _backend_state(task_id: str) -> Optional[dict]:
+    """
+    The task's state from the Celery result backend (blocking), or None if
+    unknown or the backend is unreachable.
+    """
+    if JOB_EVENTS_BACKEND == "memory":
+        return None
+    try:
+        result = AsyncResult(task_id, app=celery_app)
+        if result.state == "PENDING":
+            return None
+        return {
+            "task_id": task_id,
+            "task_status": result.state,
+            "result": _jsonable(result.result) if result.ready() else None,
+            "progress": None
+        }
+    except redis.RedisError:
+        return None
+
+async def _current_state(task_id: str) -> Optional[dict]:
+    """
+    The latest known event for a task: from this process's cache, else one
+    result backend lookup (e.g. the task finished before the client connected).
+    """
+    return hub.last_event(task_id) or await asyncio.to_thread(_backend_state, task_id)
+
+def _format(event: dict) -> str:
+    return f"data: {json.dumps(event)}\n\n"
+
+async def stream(task_id: str, request):
+    """
+    Server-Sent Events for one task, ending after a terminal state.
+    """
+    queue = hub.listen(task_id)
+    try:
+        event = await _current_state(task_id)
+        if event:
+            yield _format(event)
+            if event["task_status"] in TERMINAL_STATES:
+                return
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                # After a resubscription, make sure the task did not finish
+                # while its event could not be received
+                event = await asyncio.to_thread(_backend_state, task_id)
+                if not event or event["task_status"] not in TERMINAL_STATES:
+                    continue
+            yield _format(event)
+            if event["task_status"] in TERMINAL_STATES:
+                return
+    finally:
+        hub.unlisten(task_id, queue)
@@ -3,12 +3,17 @@ from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from datetime import timedelta
-from . import models, schemas, auth, database
+from . import models, schemas, auth, database, partitions
 from .database import engine, get_db
 
 # Create tables in the database
 models.Base.metadata.create_all(bind=engine)
 
+# Pre-create upcoming transaction partitions when partitioning is enabled
+if database.PARTITIONED:
+    with database.SessionLocal() as db:
+        partitions.ensure_partitions(db)
+
 app = FastAPI(
     title="Personal Finance Analytics Dashboard API",
     description="Backend API for tracking expenses and financial analysis",
@@ -60,7 +65,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
     # Create JWT token
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": user.username, "uid": user.id}, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -68,7 +73,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
 async def read_users_me(current_user: models.User = Depends(auth.get_current_user)):
     return current_user
 
-from .routers import categories, transactions, budgets, analytics, reports
+from .routers import categories, transactions, budgets, analytics, reports, jobs
 
 # Include routers
 app.include_router(categories.router, prefix="/categories", tags=["Categories"])
@@ -76,6 +81,7 @@ app.include_router(transactions.router, prefix="/transactions", tags=["Transacti
 app.include_router(budgets.router, prefix="/budgets", tags=["Budgets"])
 app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
 app.include_router(reports.router, prefix="/reports", tags=["Reports"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
 
 @app.get("/", tags=["Root"])
 async def root():
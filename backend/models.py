@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Decimal, Date, Boolean, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, Numeric as Decimal, Date, Boolean, ForeignKey, DateTime, Text, Float, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from .database import Base
+from .database import Base, PARTITIONED
 
 class User(Base):
     __tablename__ = "users"
@@ -33,14 +33,18 @@ class Category(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    # Partitioned tables need the partition key in the primary key
+    __table_args__ = {"postgresql_partition_by": "RANGE (date)"} if PARTITIONED else {}
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False, index=True)
     amount = Column(Decimal(15, 2), nullable=False)
     description = Column(Text)
-    date = Column(Date, server_default=func.current_date(), index=True)
+    date = Column(Date, server_default=func.current_date(), index=True, primary_key=PARTITIONED)
     is_recurring = Column(Boolean, default=False)
+    # How category_id was set: 'user', 'rule' (keyword match), 'model' or 'default'
+    category_source = Column(String(10), nullable=False, default="user", server_default="user")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -60,3 +64,39 @@ class Budget(Base):
     # Relationships
     user = relationship("User", back_populates="budgets")
     category = relationship("Category", back_populates="budgets")
+
+class CategoryStats(Base):
+    __tablename__ = "category_stats"
+    __table_args__ = (UniqueConstraint("user_id", "category_id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Welford running statistics over transaction amounts
+    count = Column(Integer, nullable=False, default=0)
+    mean = Column(Float, nullable=False, default=0.0)
+    m2 = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class TransactionArchive(Base):
+    __tablename__ = "transactions_archive"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    category_id = Column(Integer, nullable=False)
+    amount = Column(Decimal(15, 2), nullable=False)
+    description = Column(Text)
+    date = Column(Date, index=True)
+    is_recurring = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True))
+
+class TransactionRollup(Base):
+    __tablename__ = "transaction_rollups"
+    __table_args__ = (UniqueConstraint("user_id", "category_id", "day"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False, index=True)
+    total = Column(Decimal(15, 2), nullable=False)
+    count = Column(Integer, nullable=False)
@@ -0,0 +1,218 @@
+"""
+Time partitioning and archival of the transactions table.
+
+With TRANSACTION_PARTITIONING set to 'monthly' or 'yearly' on PostgreSQL the
+transactions table is declared PARTITION BY RANGE (date) and partitions are
+created ahead of time. On other databases (e.g. SQLite for local testing) the
+table stays a plain heap and archival falls back to moving rows.
+
+Archived history is summarized per (user, category, day) in
+TransactionRollup so the aggregate endpoints still cover it for any date range.
+"""
+import logging
+import os
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+import pandas as pd
+from sqlalchemy import func, text
+from sqlalchemy.exc import IntegrityError, ProgrammingError
+from sqlalchemy.orm import Session
+from . import models, database
+
+# Archival deletes hot rows, so it only runs when a retention horizon is configured
+ARCHIVE_RETENTION_MONTHS = int(os.getenv("ARCHIVE_RETENTION_MONTHS")) if os.getenv("ARCHIVE_RETENTION_MONTHS") else None
+ARCHIVE_FORMAT = os.getenv("ARCHIVE_FORMAT", "table")  # 'table' or 'parquet'
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", ".tmp/archive")
+PARTITIONS_AHEAD = int(os.getenv("PARTITIONS_AHEAD", "3"))
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_NAME = re.compile(r"^transactions_y(\d{4})(?:m(\d{2}))?$")
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_bounds(day: date) -> Tuple[str, date, date]:
+    """
+    Returns (table name, start, end) of the partition holding day.
+    """
+    if database.TRANSACTION_PARTITIONING == "yearly":
+        return f"transactions_y{day.year}", date(day.year, 1, 1), date(day.year + 1, 1, 1)
+    start = day.replace(day=1)
+    return f"transactions_y{day.year}m{day.month:02d}", start, add_months(start, 1)
+
+def list_partitions(db: Session) -> List[Tuple[str, date, date]]:
+    rows = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'transactions'"
+    )).all()
+    partitions = []
+    for (name,) in rows:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions.append(partition_bounds(date(int(match.group(1)), int(match.group(2) or 1), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+def ensure_partitions(db: Session, start: Optional[date] = None, ahead: int = PARTITIONS_AHEAD) -> List[str]:
+    """
+    Creates the default partition and every partition from start (default:
+    today) through `ahead` months in the future. Returns the tables created.
+    """
+    if not database.PARTITIONED:
+        return []
+
+    db.execute(text("CREATE TABLE IF NOT EXISTS transactions_default PARTITION OF transactions DEFAULT"))
+    existing = {name for name, _, _ in list_partitions(db)}
+    created = []
+    day = start or date.today()
+    horizon = add_months(date.today(), ahead + 1)
+    while day < horizon:
+        name, lower, upper = partition_bounds(day)
+        if name not in existing:
+            try:
+                # A partition cannot be created over rows already in the default partition
+                with db.begin_nested():
+                    db.execute(text(
+                        f"CREATE TABLE {name} PARTITION OF transactions "
+                        f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+                    ))
+                created.append(name)
+            except (IntegrityError, ProgrammingError) as exc:
+                logger.warning("Skipped partition %s: %s", name, exc.orig)
+        day = upper
+    db.commit()
+    return created
+
+def _rollup(db: Session, cutoff: date) -> int:
+    groups = db.query(
+        models.Transaction.user_id,
+        models.Transaction.category_id,
+        models.Transaction.date,
+        func.sum(models.Transaction.amount).label("total"),
+        func.count(models.Transaction.id).label("tx_count")
+    ).filter(
+        models.Transaction.date < cutoff
+    ).group_by(
+        models.Transaction.user_id, models.Transaction.category_id, models.Transaction.date
+    ).all()
+    if not groups:
+        return 0
+
+    existing = {
+        (r.user_id, r.category_id, r.day): r
+        for r in db.query(models.TransactionRollup).filter(
+            models.TransactionRollup.day >= min(g.date for g in groups),
+            models.TransactionRollup.day < cutoff
+        )
+    }
+    for g in groups:
+        key = (g.user_id, g.category_id, g.date)
+        rollup = existing.get(key)
+        if not rollup:
+            rollup = models.TransactionRollup(user_id=g.user_id, category_id=g.category_id, day=g.date, total=0, count=0)
+            db.add(rollup)
+        rollup.total += g.total
+        rollup.count += g.tx_count
+    return len(groups)
+
+def _export_parquet(db: Session, cutoff: date) -> int:
+    query = db.query(
+        models.Transaction.id,
+        models.Transaction.user_id,
+        models.Transaction.category_id,
+        models.Transaction.amount,
+        models.Transaction.description,
+        models.Transaction.date,
+        models.Transaction.is_recurring,
+        models.Transaction.created_at
+    ).filter(models.Transaction.date < cutoff)
+    df = pd.read_sql(query.statement, db.connection())
+    if df.empty:
+        return 0
+
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    df['amount'] = df['amount'].astype(float)
+    for period, part in df.groupby(pd.to_datetime(df['date']).dt.strftime('%Y_%m')):
+        # One file per month, merged without duplicate rows: a re-run after a
+        # failed commit exports identical rows, later runs add late rows
+        path = os.path.join(ARCHIVE_DIR, f"transactions_{period}.parquet")
+        if os.path.exists(path):
+            part = pd.concat([pd.read_parquet(path), part], ignore_index=True).drop_duplicates()
+        part.to_parquet(f"{path}.tmp", compression="zstd", index=False)
+        os.replace(f"{path}.tmp", path)
+    return len(df)
+
+def archive_transactions(db: Session, retention_months: Optional[int] = ARCHIVE_RETENTION_MONTHS) -> Optional[dict]:
+    """
+    Moves transactions older than the retention horizon out of the hot table.
+    Whole partitions are detached (and kept as cold tables or dropped after a
+    Parquet export); remaining old rows are moved row by row. Returns None
+    without touching anything when no retention horizon is set.
+    """
+    if not retention_months:
+        return None
+    cutoff = add_months(date.today(), -retention_months)
+    if database.TRANSACTION_PARTITIONING == "yearly":
+        cutoff = date(cutoff.year, 1, 1)
+
+    old = models.Transaction.date < cutoff
+    rolled_up = _rollup(db, cutoff)
+    exported = _export_parquet(db, cutoff) if ARCHIVE_FORMAT == "parquet" else 0
+
+    archived_partitions = []
+    if database.PARTITIONED:
+        for name, _, upper in list_partitions(db):
+            if upper > cutoff:
+                continue
+            db.execute(text(f"ALTER TABLE transactions DETACH PARTITION {name}"))
+            if ARCHIVE_FORMAT == "parquet":
+                db.execute(text(f"DROP TABLE {name}"))
+            else:
+                db.execute(text(f"ALTER TABLE {name} RENAME TO {name.replace('transactions_', 'transactions_archive_', 1)}"))
+            archived_partitions.append(name)
+
+    # Leftovers: the default partition, or the whole heap when unpartitioned
+    moved = db.query(func.count(models.Transaction.id)).filter(old).scalar()
+    if moved and ARCHIVE_FORMAT != "parquet":
+        columns = ["id", "user_id", "category_id", "amount", "description", "date", "is_recurring", "created_at"]
+        db.execute(models.TransactionArchive.__table__.insert().from_select(
+            columns,
+            db.query(*[getattr(models.Transaction, c) for c in columns]).filter(old).statement
+        ))
+    db.query(models.Transaction).filter(old).delete(synchronize_session=False)
+    db.commit()
+
+    return {
+        "cutoff": cutoff.isoformat(),
+        "format": ARCHIVE_FORMAT,
+        "rollup_groups": rolled_up,
+        "archived_partitions": archived_partitions,
+        "moved_rows": moved,
+        "exported_rows": exported
+    }
+
+def archived_totals(db: Session, user_id: int, start: Optional[date] = None, end: Optional[date] = None) -> list:
+    """
+    Daily category totals for history that has been archived, optionally
+    limited to days from start through end (inclusive).
+    """
+    query = db.query(
+        models.TransactionRollup.day,
+        models.Category.id,
+        models.Category.name,
+        models.TransactionRollup.total,
+        models.TransactionRollup.count
+    ).join(
+        models.Category, models.TransactionRollup.category_id == models.Category.id
+    ).filter(
+        models.TransactionRollup.user_id == user_id
+    )
+    if start:
+        query = query.filter(models.TransactionRollup.day >= start)
+    if end:
+        query = query.filter(models.TransactionRollup.day <= end)
+    return query.all()
@@ -0,0 +1,215 @@
+"""
+Recurring transaction detection.
+
+Transactions are grouped by normalized description and amount band, and the
+intervals between each group's sorted dates are compared against known
+cadences. All grouping and interval statistics run over NumPy arrays so a
+full backfill is a handful of vectorized passes rather than a per-row loop.
+"""
+import re
+from datetime import date, timedelta
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+from . import models
+
+# (name, expected gap in days, tolerance in days)
+CADENCES = [
+    ("weekly", 7.0, 1.5),
+    ("monthly", 30.44, 4.0),
+    ("yearly", 365.25, 15.0),
+]
+MIN_OCCURRENCES = 3
+# Bands are AMOUNT_BAND_RATIO wide and centered on the median amount of the
+# description group, so charges within ~7% of the typical amount share a band
+AMOUNT_BAND_RATIO = 1.15
+UPDATE_CHUNK_SIZE = 10000
+
+# Digits and punctuation carry reference numbers, dates and card suffixes
+_NOISE = re.compile(r"[^a-z ]+")
+
+def normalize_description(description: Optional[str]) -> str:
+    text = _NOISE.sub(" ", (description or "").lower())
+    return " ".join(text.split())
+
+def description_keys(user_ids: np.ndarray, descriptions: list, amounts: np.ndarray) -> np.ndarray:
+    """
+    Packs (user, sign, normalized description) into one int64 key, leaving
+    the low 10 bits for the amount band. Descriptions are normalized once
+    per distinct raw value.
+    """
+    raw_codes, raw_uniques = pd.factorize(pd.Series(descriptions, dtype=object).fillna(""))
+    norm_codes, _ = pd.factorize(pd.Series([normalize_description(d) for d in raw_uniques], dtype=object))
+    desc_codes = norm_codes[raw_codes].astype(np.int64) if len(raw_codes) else np.zeros(0, dtype=np.int64)
+    negative = (amounts < 0).astype(np.int64)
+    return (user_ids.astype(np.int64) << 41) | (negative << 40) | (desc_codes << 10)
+
+def group_keys(user_ids: np.ndarray, descriptions: list, amounts: np.ndarray) -> np.ndarray:
+    """
+    Packs (user, sign, normalized description, amount band) into one int64 key.
+    """
+    base = description_keys(user_ids, descriptions, amounts)
+    if not len(base):
+        return base
+    magnitude = np.maximum(np.abs(amounts), 0.01)
+
+    # Median magnitude per description group: middle row of each sorted run
+    _, group = np.unique(base, return_inverse=True)
+    order = np.lexsort((magnitude, group))
+    counts = np.bincount(group)
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    median = magnitude[order[starts + (counts - 1) // 2]]
+
+    bands = np.round(np.log(magnitude / median[group]) / np.log(AMOUNT_BAND_RATIO)).astype(np.int64)
+    return base | (np.clip(bands, -512, 511) + 512)
+
+def detect_recurring(keys: np.ndarray, days: np.ndarray) -> dict:
+    """
+    Finds periodic groups. Returns the group index of every row plus
+    per-group arrays: cadence (index into CADENCES, -1 if none), mean gap,
+    occurrence count (distinct days) and the row index of the most recent
+    occurrence. Same-day repeats, e.g. a statement imported twice, do not
+    count as gaps.
+    """
+    _, group_of_row = np.unique(keys, return_inverse=True)
+    n_groups = int(group_of_row.max()) + 1 if len(keys) else 0
+
+    order = np.lexsort((days, group_of_row))
+    g = group_of_row[order]
+    d = days[order]
+
+    same = g[1:] == g[:-1]
+    step = np.diff(d)
+    counted = same & (step > 0)
+    gaps = step[counted].astype(np.float64)
+    gap_group = g[1:][counted]
+
+    n_gaps = np.bincount(gap_group, minlength=n_groups)
+    gap_sum = np.bincount(gap_group, weights=gaps, minlength=n_groups)
+    gap_sq_sum = np.bincount(gap_group, weights=gaps ** 2, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_gap = gap_sum / n_gaps
+        std_gap = np.sqrt(np.maximum(gap_sq_sum / n_gaps - mean_gap ** 2, 0))
+
+    # Rows are sorted by (group, date) so each group's last row is its latest
+    ends = np.flatnonzero(np.r_[~same, True]) if len(keys) else np.zeros(0, dtype=np.int64)
+    last_row = np.empty(n_groups, dtype=np.int64)
+    last_row[g[ends]] = order[ends]
+
+    cadence = np.full(n_groups, -1, dtype=np.int64)
+    enough = n_gaps >= MIN_OCCURRENCES - 1
+    for i, (_, period, tolerance) in enumerate(CADENCES):
+        match = (cadence < 0) & enough & (np.abs(mean_gap - period) <= tolerance) & (std_gap <= tolerance)
+        cadence[match] = i
+
+    return {
+        "group_of_row": group_of_row,
+        "cadence": cadence,
+        "mean_gap": mean_gap,
+        "occurrences": n_gaps + 1,
+        "last_row": last_row,
+    }
+
+def _load_rows(db: Session, user_id: Optional[int] = None) -> dict:
+    query = db.query(
+        models.Transaction.id,
+        models.Transaction.user_id,
+        models.Transaction.description,
+        models.Transaction.amount,
+        models.Transaction.date,
+        models.Transaction.is_recurring
+    )
+    if user_id is not None:
+        query = query.filter(models.Transaction.user_id == user_id)
+    rows = query.all()
+
+    return {
+        "ids": np.array([r.id for r in rows], dtype=np.int64),
+        "user_ids": np.array([r.user_id for r in rows], dtype=np.int64),
+        "descriptions": [r.description for r in rows],
+        "amounts": np.array([r.amount for r in rows], dtype=np.float64),
+        "days": np.array([r.date for r in rows], dtype="datetime64[D]").astype(np.int64),
+        "flags": np.array([bool(r.is_recurring) for r in rows], dtype=bool),
+    }
+
+def _write_flags(db: Session, ids: np.ndarray, value: bool):
+    for start in range(0, len(ids), UPDATE_CHUNK_SIZE):
+        chunk = ids[start:start + UPDATE_CHUNK_SIZE].tolist()
+        db.query(models.Transaction).filter(
+            models.Transaction.id.in_(chunk)
+        ).update({models.Transaction.is_recurring: value}, synchronize_session=False)
+
+def update_recurring_flags(db: Session, user_id: Optional[int] = None, new_items: Optional[List[dict]] = None) -> int:
+    """
+    Recomputes is_recurring and writes only the rows whose flag changed.
+    With new_items (parsed upload rows for user_id) only the groups those
+    rows fall into are re-evaluated; otherwise every group is (backfill).
+    Returns the number of rows updated.
+    """
+    rows = _load_rows(db, user_id)
+    if not len(rows["ids"]):
+        return 0
+
+    user_ids, descriptions, amounts = rows["user_ids"], rows["descriptions"], rows["amounts"]
+    n = len(rows["ids"])
+    if new_items:
+        # Key the new rows in the same factorization so codes line up; bands
+        # depend on the whole description group, so all of it is re-evaluated
+        base = description_keys(
+            np.r_[user_ids, np.full(len(new_items), user_id, dtype=np.int64)],
+            descriptions + [item["description"] for item in new_items],
+            np.r_[amounts, np.array([item["amount"] for item in new_items], dtype=np.float64)]
+        )
+        affected = np.isin(base[:n], base[n:])
+    else:
+        affected = np.ones(n, dtype=bool)
+    if not affected.any():
+        return 0
+    keys = group_keys(user_ids[affected], [d for d, a in zip(descriptions, affected) if a], amounts[affected])
+
+    result = detect_recurring(keys, rows["days"][affected])
+    recurring = result["cadence"][result["group_of_row"]] >= 0
+
+    ids = rows["ids"][affected]
+    changed = recurring != rows["flags"][affected]
+    _write_flags(db, ids[changed & recurring], True)
+    _write_flags(db, ids[changed & ~recurring], False)
+    db.commit()
+    return int(changed.sum())
+
+def predict_next_charges(db: Session, user_id: int, today: Optional[date] = None) -> List[dict]:
+    """
+    Lists the user's recurring charges with their expected next date.
+    Charges overdue by more than the cadence tolerance (e.g. cancelled
+    subscriptions) are left out.
+    """
+    today = today or date.today()
+    rows = _load_rows(db, user_id)
+    if not len(rows["ids"]):
+        return []
+
+    keys = group_keys(rows["user_ids"], rows["descriptions"], rows["amounts"])
+    result = detect_recurring(keys, rows["days"])
+    group_of_row = result["group_of_row"]
+    amount_sum = np.bincount(group_of_row, weights=rows["amounts"])
+    row_count = np.bincount(group_of_row)
+
+    charges = []
+    for group in np.flatnonzero(result["cadence"] >= 0):
+        last = result["last_row"][group]
+        last_date = date.fromordinal(date(1970, 1, 1).toordinal() + int(rows["days"][last]))
+        name, _, tolerance = CADENCES[result["cadence"][group]]
+        next_date = last_date + timedelta(days=int(round(result["mean_gap"][group])))
+        if next_date + timedelta(days=tolerance) < today:
+            continue
+        charges.append({
+            "description": rows["descriptions"][last],
+            "average_amount": float(amount_sum[group] / row_count[group]),
+            "cadence": name,
+            "occurrences": int(result["occurrences"][group]),
+            "last_date": last_date,
+            "next_date": next_date
+        })
+
+    return sorted(charges, key=lambda c: c["next_date"])
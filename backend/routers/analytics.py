@@ -1,79 +1,184 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-import pandas as pd
+from typing import Optional
 import numpy as np
 from datetime import date, datetime
-from .. import models, auth, database
+from execution.columnar import monthly_totals, month_label, sum_by
+from .. import models, auth, recurring, anomalies, partitions, data_version, analytics_store
 
 router = APIRouter()
 
-@router.get("/trends")
+def _forecast_from_monthly(monthly: np.ndarray, tx_count: int) -> dict:
+    """
+    Fits a linear trend to monthly totals and extrapolates one month ahead.
+    """
+    if tx_count < 10:  # Arbitrary threshold for "enough" data
+        return {
+            "prediction": None,
+            "message": "Not enough data points for accurate prediction. Please upload more statements."
+        }
+
+    if len(monthly) < 2:
+        return {"prediction": None, "message": "Need at least 2 months of data to forecast."}
+
+    # x = month index, y = spending
+    x = np.arange(len(monthly))
+
+    # Linear Regression using numpy.polyfit
+    m, b = np.polyfit(x, monthly, 1)
+
+    next_month_val = m * len(monthly) + b
+
+    return {
+        "predicted_amount": float(max(0, next_month_val)),
+        "trend": "increasing" if m > 0 else "decreasing",
+        "monthly_growth_rate": float(m)
+    }
+
+def _monthly_series(db: Session, user_id: int):
+    """
+    Row-level month index, category id and amount arrays for the user's hot
+    transactions (columnar store) followed by archived daily rollups.
+    """
+    columns = analytics_store.get_columns(db, user_id)
+    archived = partitions.archived_totals(db, user_id)
+    month_idx = np.concatenate([
+        columns.month_index(),
+        np.array([r.day.year * 12 + r.day.month - 1 for r in archived], dtype=np.int64)
+    ])
+    cat_ids = np.concatenate([
+        columns.category_ids.astype(np.int64),
+        np.array([r.id for r in archived], dtype=np.int64)
+    ])
+    amounts = np.concatenate([
+        columns.cents / 100,
+        np.array([float(r.total) for r in archived], dtype=np.float64)
+    ])
+    return month_idx, cat_ids, amounts, len(columns) + sum(r.count for r in archived)
+
+@router.get("/trends", dependencies=[Depends(data_version.conditional_get)])
 async def get_monthly_trends(
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(auth.get_read_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
     """
-    Returns monthly spending trends using Pandas resampling.
+    Returns monthly spending trends from the columnar analytics store.
     """
-    transactions = db.query(models.Transaction).filter(
-        models.Transaction.user_id == current_user.id
-    ).all()
-    
-    if not transactions:
+    month_idx, _, amounts, _ = _monthly_series(db, current_user.id)
+    if not len(month_idx):
         return []
 
-    # Prepare data for Pandas
-    data = [
-        {"date": t.date, "amount": float(t.amount)}
-        for t in transactions
+    first, monthly = monthly_totals(month_idx, amounts)
+    return [
+        {"date": month_label(first + i), "amount": float(amount)}
+        for i, amount in enumerate(monthly)
     ]
-    df = pd.DataFrame(data)
-    df['date'] = pd.to_datetime(df['date'])
-    
-    # Group by month and sum amounts
-    # Resampling is efficient for time-series as noted in SKILL.md
-    df.set_index('date', inplace=True)
-    monthly_df = df.resample('ME')['amount'].sum().reset_index()
-    monthly_df['date'] = monthly_df['date'].dt.strftime('%b %Y')
-    
-    return monthly_df.to_dict(orient='records')
-
-@router.get("/forecast")
+
+@router.get("/forecast", dependencies=[Depends(data_version.conditional_get)])
 async def get_spending_forecast(
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(auth.get_read_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
     """
     Predicts next month's spending using simple linear regression.
     """
-    transactions = db.query(models.Transaction).filter(
-        models.Transaction.user_id == current_user.id
+    month_idx, _, amounts, tx_count = _monthly_series(db, current_user.id)
+    if tx_count < 10:
+        return _forecast_from_monthly(np.array([]), tx_count)
+
+    _, monthly = monthly_totals(month_idx, amounts)
+    return _forecast_from_monthly(monthly, tx_count)
+
+@router.get("/recurring", dependencies=[Depends(data_version.conditional_get)])
+async def get_recurring_charges(
+    db: Session = Depends(auth.get_read_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """
+    Lists detected recurring charges with their predicted next date.
+    """
+    return recurring.predict_next_charges(db, current_user.id)
+
+@router.get("/anomalies", dependencies=[Depends(data_version.conditional_get)])
+async def get_anomalies(
+    threshold: float = anomalies.Z_THRESHOLD,
+    days: int = anomalies.WINDOW_DAYS,
+    db: Session = Depends(auth.get_read_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """
+    Returns recent z-score outlier charges and category spikes.
+    """
+    return anomalies.find_anomalies(db, current_user.id, threshold=threshold, days=days)
+
+@router.get("/dashboard", dependencies=[Depends(data_version.conditional_get)])
+async def get_dashboard_snapshot(
+    month_start: Optional[date] = None,
+    db: Session = Depends(auth.get_read_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """
+    Returns the trends, forecast, monthly summary and budget performance
+    panels in one payload, computed from the user's columnar transaction store.
+    """
+    if month_start is None:
+        month_start = date.today().replace(day=1)
+
+    # Shared arrays: one element per transaction (or archived day/category)
+    month_idx, cat_ids, totals, tx_count = _monthly_series(db, current_user.id)
+    names = dict(db.query(models.Category.id, models.Category.name).filter(
+        models.Category.user_id == current_user.id
+    ).all())
+
+    budgets = db.query(
+        models.Budget.category_id,
+        models.Category.name,
+        models.Budget.amount
+    ).join(
+        models.Category, models.Budget.category_id == models.Category.id
+    ).filter(
+        models.Budget.user_id == current_user.id,
+        models.Budget.start_date == month_start
     ).all()
-    
-    if len(transactions) < 10:  # Arbitrary threshold for "enough" data
-        return {
-            "prediction": None,
-            "message": "Not enough data points for accurate prediction. Please upload more statements."
-        }
 
-    df = pd.DataFrame([{"date": t.date, "amount": float(t.amount)} for t in transactions])
-    df['date'] = pd.to_datetime(df['date'])
-    monthly = df.resample('ME', on='date')['amount'].sum().reset_index()
-    
-    if len(monthly) < 2:
-        return {"prediction": None, "message": "Need at least 2 months of data to forecast."}
+    current_idx = month_start.year * 12 + month_start.month - 1
+
+    # Trends and forecast: monthly totals with empty months filled with zero
+    trends = []
+    monthly = np.array([])
+    if len(month_idx):
+        first, monthly = monthly_totals(month_idx, totals)
+        trends = [
+            {"date": month_label(first + i), "amount": float(amount)}
+            for i, amount in enumerate(monthly)
+        ]
+
+    # Summary: spending by category within the selected month
+    summary = {}
+    in_month = month_idx == current_idx
+    for cat_id, amount in sum_by(cat_ids[in_month], totals[in_month]).items():
+        name = names.get(cat_id, "Unknown")
+        summary[name] = summary.get(name, 0.0) + amount
+
+    # Budget performance: spending since month_start against each budget
+    since = month_idx >= current_idx
+    spent_by_cat = sum_by(cat_ids[since], totals[since])
+
+    performance = []
+    for b in budgets:
+        limit = float(b.amount)
+        spent = spent_by_cat.get(b.category_id, 0.0)
+        performance.append({
+            "category": b.name,
+            "budget": limit,
+            "spent": spent,
+            "remaining": limit - spent,
+            "percent": (spent / limit) * 100 if limit > 0 else 0
+        })
 
-    # x = month index, y = spending
-    x = np.arange(len(monthly)).reshape(-1, 1)
-    y = monthly['amount'].values
-    
-    # Linear Regression using numpy.polyfit
-    m, b = np.polyfit(x.flatten(), y, 1)
-    
-    next_month_val = m * len(monthly) + b
-    
     return {
-        "predicted_amount": float(max(0, next_month_val)),
-        "trend": "increasing" if m > 0 else "decreasing",
-        "monthly_growth_rate": float(m)
+        "trends": trends,
+        "forecast": _forecast_from_monthly(monthly, tx_count),
+        "summary": [{"category": name, "total_spent": amount} for name, amount in summary.items()],
+        "performance": performance
     }
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List
 from datetime import date
-from .. import models, schemas, auth, database
+from .. import models, schemas, auth, database, partitions, data_version, analytics_store
 
 router = APIRouter()
 
@@ -33,20 +33,21 @@ async def create_budget(
     new_budget = models.Budget(**budget.dict(), user_id=current_user.id)
     db.add(new_budget)
     db.commit()
+    analytics_store.touch(current_user.id, data_version.bump_version(current_user.id))
     db.refresh(new_budget)
     return new_budget
 
-@router.get("/", response_model=List[schemas.BudgetRead])
+@router.get("/", response_model=List[schemas.BudgetRead], dependencies=[Depends(data_version.conditional_get)])
 async def get_budgets(
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
     return db.query(models.Budget).filter(models.Budget.user_id == current_user.id).all()
 
-@router.get("/performance")
+@router.get("/performance", dependencies=[Depends(data_version.conditional_get)])
 async def get_budget_performance(
     month_start: date,
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(auth.get_read_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
     """
@@ -65,6 +66,7 @@ async def get_budget_performance(
     ).group_by(models.Transaction.category_id).subquery()
 
     results = db.query(
+        models.Category.id,
         models.Category.name,
         models.Budget.amount.label("budget_limit"),
         func.coalesce(transactions_sub.c.total_spent, 0).label("spent")
@@ -77,12 +79,20 @@ async def get_budget_performance(
         models.Budget.start_date == month_start
     ).all()
 
-    return [
-        {
+    # Archived days since month_start
+    archived = {}
+    for a in partitions.archived_totals(db, current_user.id, start=month_start):
+        archived[a.id] = archived.get(a.id, 0.0) + float(a.total)
+
+    performance = []
+    for r in results:
+        limit = float(r.budget_limit)
+        spent = float(r.spent) + archived.get(r.id, 0.0)
+        performance.append({
             "category": r.name,
-            "budget": float(r.budget_limit),
-            "spent": float(r.spent),
-            "remaining": float(r.budget_limit - r.spent),
-            "percent": float((r.spent / r.budget_limit) * 100) if r.budget_limit > 0 else 0
-        } for r in results
-    ]
+            "budget": limit,
+            "spent": spent,
+            "remaining": limit - spent,
+            "percent": (spent / limit) * 100 if limit > 0 else 0
+        })
+    return performance
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
-from .. import models, schemas, auth, database
+from .. import models, schemas, auth, database, data_version, analytics_store
 
 router = APIRouter()
 
@@ -22,10 +22,11 @@ async def create_category(
     new_category = models.Category(**category.dict(), user_id=current_user.id)
     db.add(new_category)
     db.commit()
+    analytics_store.touch(current_user.id, data_version.bump_version(current_user.id))
     db.refresh(new_category)
     return new_category
 
-@router.get("/", response_model=List[schemas.CategoryRead])
+@router.get("/", response_model=List[schemas.CategoryRead], dependencies=[Depends(data_version.conditional_get)])
 async def get_categories(
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(auth.get_current_user)
@@ -45,6 +46,15 @@ async def delete_category(
     if not db_category:
         raise HTTPException(status_code=404, detail="Category not found")
     
+    # Running stats outlive the category's transactions (count 0 rows), and
+    # archived rollups have no live transactions to block the delete
+    db.query(models.CategoryStats).filter(
+        models.CategoryStats.category_id == category_id
+    ).delete(synchronize_session=False)
+    db.query(models.TransactionRollup).filter(
+        models.TransactionRollup.category_id == category_id
+    ).delete(synchronize_session=False)
     db.delete(db_category)
     db.commit()
+    analytics_store.touch(current_user.id, data_version.bump_version(current_user.id))
     return {"message": "Category deleted"}
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from .. import job_events
+
+router = APIRouter()
+
+@router.get("/events/{task_id}")
+async def stream_job_events(task_id: str, request: Request):
+    """
+    Streams state and progress of any background job as Server-Sent Events.
+    """
+    return StreamingResponse(
+        job_events.stream(task_id, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from .. import models, auth, database, worker
+from .. import models, auth, worker, job_events
 from celery.result import AsyncResult
 import os
 
@@ -10,7 +10,7 @@ router = APIRouter()
 @router.post("/generate")
 async def trigger_report(
     month: str,  # format e.g., "January 2024"
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(auth.get_read_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
     """
@@ -48,6 +48,17 @@ async def get_report_status(task_id: str):
         "result": task_result.result if task_result.ready() else None
     }
 
+@router.get("/events/{task_id}")
+async def stream_report_events(task_id: str, request: Request):
+    """
+    Streams status and progress of a PDF generation task as Server-Sent Events.
+    """
+    return StreamingResponse(
+        job_events.stream(task_id, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/download/{filename}")
 async def download_report(filename: str):
     """
@@ -1,15 +1,106 @@
-import subprocess
-import json
+import asyncio
+import logging
 import shutil
 import os
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from kombu.exceptions import OperationalError
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, UploadFile, File
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import date
-from .. import models, schemas, auth, database
+from execution.parse_statement import parse_statement
+from .. import models, schemas, auth, database, recurring, anomalies, partitions, data_version, categorizer, worker, analytics_store
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Parsing is CPU bound (pandas), so statements are fanned out to a bounded
+# process pool shared by all requests in this API process.
+UPLOAD_MAX_WORKERS = int(os.getenv("UPLOAD_MAX_WORKERS", str(os.cpu_count() or 1)))
+# Limits on what one ZIP upload may extract into .tmp
+UPLOAD_ZIP_MAX_MEMBERS = int(os.getenv("UPLOAD_ZIP_MAX_MEMBERS", "100"))
+UPLOAD_ZIP_MAX_BYTES = int(os.getenv("UPLOAD_ZIP_MAX_BYTES", str(100 * 1024 * 1024)))
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=UPLOAD_MAX_WORKERS)
+    return _parse_pool
+
+def _reset_parse_pool(pool: ProcessPoolExecutor):
+    """
+    Drops a broken pool (e.g. a worker killed for memory) so the next upload
+    gets a fresh one.
+    """
+    global _parse_pool
+    if _parse_pool is pool:
+        _parse_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _stage_upload(file: UploadFile, work_dir: str) -> List[Tuple[str, str]]:
+    """
+    Writes an uploaded CSV to work_dir, or extracts the CSV members of a ZIP.
+    Returns (display name, staged path) pairs.
+    """
+    if file.filename.endswith('.zip'):
+        staged = []
+        extracted = 0
+        with zipfile.ZipFile(file.file) as archive:
+            for member in archive.infolist():
+                name = os.path.basename(member.filename)
+                if member.is_dir() or not name.endswith('.csv'):
+                    continue
+                if len(staged) >= UPLOAD_ZIP_MAX_MEMBERS:
+                    raise HTTPException(status_code=413, detail=f"{file.filename} has more than {UPLOAD_ZIP_MAX_MEMBERS} CSV files")
+                # Members get fresh names so archives cannot write outside work_dir
+                fd, target = tempfile.mkstemp(suffix=".csv", dir=work_dir)
+                with archive.open(member) as src, os.fdopen(fd, "wb") as dst:
+                    # Count actual output, since declared sizes in the archive can lie
+                    while chunk := src.read(1024 * 1024):
+                        extracted += len(chunk)
+                        if extracted > UPLOAD_ZIP_MAX_BYTES:
+                            raise HTTPException(status_code=413, detail=f"{file.filename} extracts to more than {UPLOAD_ZIP_MAX_BYTES} bytes")
+                        dst.write(chunk)
+                staged.append((f"{file.filename}/{member.filename}", target))
+        return staged
+
+    fd, target = tempfile.mkstemp(suffix=".csv", dir=work_dir)
+    with os.fdopen(fd, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+    return [(file.filename, target)]
+
+async def _parse_files(paths: List[str]) -> List[dict]:
+    """
+    Parses staged statements in parallel on the process pool.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_parse_pool()
+    try:
+        futures = [loop.run_in_executor(pool, parse_statement, path) for path in paths]
+    except BrokenProcessPool:
+        # Broken by an earlier upload; retry once on a fresh pool
+        _reset_parse_pool(pool)
+        pool = get_parse_pool()
+        futures = [loop.run_in_executor(pool, parse_statement, path) for path in paths]
+    results = await asyncio.gather(*futures, return_exceptions=True)
+    if any(isinstance(result, BrokenProcessPool) for result in results):
+        _reset_parse_pool(pool)
+    return results
+
+def _queue_training(user_id: int):
+    """
+    Queues a categorizer retrain. Runs as a background task after the
+    response, so a down broker delays nobody; the next labelled write retries.
+    """
+    try:
+        worker.train_categorizer.apply_async((user_id,), retry=False)
+    except OperationalError as exc:
+        logger.warning("Could not queue categorizer training for user %s: %s", user_id, exc)
 
 def auto_categorize(description: str, categories: List[models.Category]) -> Optional[int]:
     """
@@ -24,40 +115,56 @@ def auto_categorize(description: str, categories: List[models.Category]) -> Opti
 
 @router.post("/upload")
 async def upload_statement(
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    files: List[UploadFile] = File([]),
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
     """
-    Uploads a bank statement, parses it using the execution layer script,
-    and bulk inserts transactions with auto-categorization.
+    Uploads one or more bank statements (CSV files or ZIP archives of CSVs),
+    parses them in parallel using the execution layer logic, and bulk inserts
+    the merged transactions with auto-categorization. Single-file clients
+    keep sending the original `file` field; `files` takes several.
     """
-    if not file.filename.endswith('.csv'):
-        raise HTTPException(status_code=400, detail="Only CSV files are supported")
+    files = ([file] if file else []) + files
+    if not files:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+    for file in files:
+        if not file.filename.endswith(('.csv', '.zip')):
+            raise HTTPException(status_code=400, detail=f"Unsupported file type: {file.filename}")
 
-    # 1. Save file to .tmp
+    # 1. Stage files (and ZIP members) in .tmp
     os.makedirs(".tmp", exist_ok=True)
-    tmp_path = f".tmp/{current_user.id}_{file.filename}"
-    with open(tmp_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    # 2. Call execution script (Layer 3)
+    work_dir = tempfile.mkdtemp(prefix=f"{current_user.id}_", dir=".tmp")
     try:
-        # We use the absolute or relative path to the script
-        result = subprocess.run(
-            ["python", "execution/parse_statement.py", "--input", tmp_path],
-            capture_output=True, text=True, check=True
-        )
-        parsed_data = json.loads(result.stdout)
-        
-        if "error" in parsed_data:
-            raise HTTPException(status_code=400, detail=parsed_data["error"])
-            
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Parsing failed: {str(e)}")
+        try:
+            staged = []
+            for file in files:
+                staged.extend(_stage_upload(file, work_dir))
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="Invalid ZIP archive")
+
+        if not staged:
+            raise HTTPException(status_code=400, detail="No CSV files found in upload")
+
+        # 2. Parse all statements in parallel (Layer 3)
+        results = await _parse_files([path for _, path in staged])
     finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    parsed_data = []
+    file_status = []
+    for (filename, _), result in zip(staged, results):
+        if isinstance(result, Exception):
+            file_status.append({"filename": filename, "status": "failed", "error": f"Parsing failed: {str(result)}"})
+        elif isinstance(result, dict) and "error" in result:
+            file_status.append({"filename": filename, "status": "failed", "error": result["error"]})
+        else:
+            parsed_data.extend(result)
+            file_status.append({"filename": filename, "status": "processed", "count": len(result)})
+
+    if all(f["status"] == "failed" for f in file_status):
+        raise HTTPException(status_code=400, detail=file_status)
 
     # 3. Get user categories for auto-matching
     user_categories = db.query(models.Category).filter(models.Category.user_id == current_user.id).all()
@@ -74,13 +181,28 @@ async def upload_statement(
         db.refresh(uncategorized)
 
     # 4. Process and insert transactions
+    cat_ids = [auto_categorize(item['description'], user_categories) for item in parsed_data]
+    sources = ["rule" if cat_id else "default" for cat_id in cat_ids]
+
+    # Rows the keyword rules miss go to the learned model in one batch call,
+    # off the event loop since it may load the model from disk
+    unmatched = [i for i, cat_id in enumerate(cat_ids) if cat_id is None]
+    predicted = await asyncio.to_thread(
+        categorizer.predict_categories,
+        current_user.id,
+        [parsed_data[i]['description'] for i in unmatched],
+        {cat.id for cat in user_categories}
+    )
+    for i, cat_id in zip(unmatched, predicted):
+        if cat_id:
+            cat_ids[i], sources[i] = cat_id, "model"
+
     new_transactions = []
-    for item in parsed_data:
-        cat_id = auto_categorize(item['description'], user_categories) or uncategorized.id
-        
+    for item, cat_id, source in zip(parsed_data, cat_ids, sources):
         tx = models.Transaction(
             user_id=current_user.id,
-            category_id=cat_id,
+            category_id=cat_id or uncategorized.id,
+            category_source=source,
             amount=item['amount'],
             description=item['description'],
             date=item['date']
@@ -88,16 +210,24 @@ async def upload_statement(
         new_transactions.append(tx)
     
     db.bulk_save_objects(new_transactions)
+    anomalies.record_batch(db, current_user.id, new_transactions)
     db.commit()
 
+    # 5. Re-evaluate recurring charges for the groups this upload touched
+    recurring.update_recurring_flags(db, user_id=current_user.id, new_items=parsed_data)
+    version = data_version.bump_version(current_user.id)
+    analytics_store.append(current_user.id, new_transactions, version)
+
     return {
         "message": f"Successfully processed {len(new_transactions)} transactions",
-        "count": len(new_transactions)
+        "count": len(new_transactions),
+        "files": file_status
     }
 
 @router.post("/", response_model=schemas.TransactionRead)
 async def create_transaction(
     transaction: schemas.TransactionCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
@@ -111,11 +241,47 @@ async def create_transaction(
 
     new_transaction = models.Transaction(**transaction.dict(), user_id=current_user.id)
     db.add(new_transaction)
+    anomalies.record_transaction(db, new_transaction)
     db.commit()
+    version = data_version.bump_version(current_user.id)
+    analytics_store.append(current_user.id, [new_transaction], version)
+    # Manually categorized transactions are training examples
+    background_tasks.add_task(_queue_training, current_user.id)
     db.refresh(new_transaction)
     return new_transaction
 
-@router.get("/", response_model=List[schemas.TransactionRead])
+@router.patch("/{transaction_id}", response_model=schemas.TransactionRead)
+async def update_transaction(
+    transaction_id: int,
+    update: schemas.TransactionUpdate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    db_transaction = db.query(models.Transaction).filter(
+        models.Transaction.id == transaction_id,
+        models.Transaction.user_id == current_user.id
+    ).first()
+    if not db_transaction:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    category = db.query(models.Category).filter(
+        models.Category.id == update.category_id,
+        models.Category.user_id == current_user.id
+    ).first()
+    if not category:
+        raise HTTPException(status_code=400, detail="Invalid category ID")
+
+    anomalies.move_transaction(db, db_transaction, category.id)
+    db_transaction.category_source = "user"
+    db.commit()
+    version = data_version.bump_version(current_user.id)
+    analytics_store.replace(current_user.id, db_transaction, version)
+    # A correction is a training example, even when the category is unchanged
+    background_tasks.add_task(_queue_training, current_user.id)
+    db.refresh(db_transaction)
+    return db_transaction
+
+@router.get("/", response_model=List[schemas.TransactionRead], dependencies=[Depends(data_version.conditional_get)])
 async def get_transactions(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
@@ -134,11 +300,11 @@ async def get_transactions(
     
     return query.order_by(models.Transaction.date.desc()).all()
 
-@router.get("/summary")
+@router.get("/summary", dependencies=[Depends(data_version.conditional_get)])
 async def get_transaction_summary(
     start_date: date,
     end_date: date,
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(auth.get_read_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
     """
@@ -156,9 +322,14 @@ async def get_transaction_summary(
     ).group_by(
         models.Category.name
     ).all()
+
+    totals = {name: float(amount) for name, amount in summary}
+    # Archived days inside the range
+    for r in partitions.archived_totals(db, current_user.id, start_date, end_date):
+        totals[r.name] = totals.get(r.name, 0.0) + float(r.total)
     
     return [
-        {"category": name, "total_spent": float(amount)} for name, amount in summary
+        {"category": name, "total_spent": amount} for name, amount in totals.items()
     ]
 
 @router.delete("/{transaction_id}")
@@ -174,6 +345,9 @@ async def delete_transaction(
     if not db_transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     
+    anomalies.remove_transaction(db, db_transaction)
     db.delete(db_transaction)
     db.commit()
+    version = data_version.bump_version(current_user.id)
+    analytics_store.delete(current_user.id, transaction_id, version)
     return {"message": "Transaction deleted"}
@@ -53,6 +53,9 @@ class TransactionBase(BaseModel):
 class TransactionCreate(TransactionBase):
     pass
 
+class TransactionUpdate(BaseModel):
+    category_id: int
+
 class TransactionRead(TransactionBase):
     id: int
     user_id: int
@@ -1,9 +1,19 @@
+from celery.signals import task_prerun, task_postrun
 from .celery_app import celery_app
+from . import database, recurring, anomalies, partitions, data_version, categorizer, job_events
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 import os
 from datetime import datetime
 
+@task_prerun.connect
+def publish_task_started(task_id=None, **kwargs):
+    job_events.publish(task_id, "STARTED")
+
+@task_postrun.connect
+def publish_task_finished(task_id=None, retval=None, state=None, **kwargs):
+    job_events.publish(task_id, state, result=retval)
+
 @celery_app.task(name="generate_monthly_report")
 def generate_monthly_report(user_id: int, user_email: str, transactions_data: list, month: str):
     """
@@ -29,12 +39,77 @@ def generate_monthly_report(user_id: int, user_email: str, transactions_data: li
     c.drawString(100, height - 140, "Recent Transactions:")
     y = height - 160
     c.setFont("Helvetica", 10)
-    for tx in transactions_data[:20]: # Limit to first 20 for the demo
+    rows = transactions_data[:20] # Limit to first 20 for the demo
+    for i, tx in enumerate(rows):
         c.drawString(100, y, f"{tx['date']} | {tx['amount']} | {tx['description'][:40]}")
         y -= 20
+        job_events.publish(
+            generate_monthly_report.request.id, "PROGRESS",
+            progress={"current": i + 1, "total": len(rows)}
+        )
         if y < 50:
             c.showPage()
             y = height - 50
     
     c.save()
     return {"filename": filename, "status": "completed"}
+
+@celery_app.task(name="backfill_recurring_transactions")
+def backfill_recurring_transactions(user_id: int = None):
+    """
+    Recomputes is_recurring for one user, or for every user when user_id is None.
+    """
+    db = database.SessionLocal()
+    try:
+        updated = recurring.update_recurring_flags(db, user_id=user_id)
+    finally:
+        db.close()
+    if user_id is None:
+        data_version.bump_all()
+    else:
+        data_version.bump_version(user_id)
+    return {"updated": updated, "status": "completed"}
+
+@celery_app.task(name="rebuild_anomaly_stats")
+def rebuild_anomaly_stats(user_id: int = None):
+    """
+    Rebuilds the per-category running statistics used for anomaly detection.
+    """
+    db = database.SessionLocal()
+    try:
+        groups = anomalies.rebuild_stats(db, user_id=user_id)
+    finally:
+        db.close()
+    if user_id is None:
+        data_version.bump_all()
+    else:
+        data_version.bump_version(user_id)
+    return {"groups": groups, "status": "completed"}
+
+@celery_app.task(name="maintain_transaction_partitions")
+def maintain_transaction_partitions():
+    """
+    Creates upcoming partitions and, when ARCHIVE_RETENTION_MONTHS is set,
+    archives history past the retention horizon.
+    """
+    db = database.SessionLocal()
+    try:
+        created = partitions.ensure_partitions(db)
+        archived = partitions.archive_transactions(db)
+    finally:
+        db.close()
+    if created or archived:
+        data_version.bump_all()
+    return {"created_partitions": created, "archive": archived, "status": "completed"}
+
+@celery_app.task(name="train_categorizer", ignore_result=True)
+def train_categorizer(user_id: int):
+    """
+    Updates the user's learned categorization model from categorized transactions.
+    """
+    db = database.SessionLocal()
+    try:
+        result = categorizer.train_user_model(db, user_id)
+    finally:
+        db.close()
+    return {**result, "status": "completed"}
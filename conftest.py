@@ -0,0 +1,4 @@
+import os
+
+# Unit tests need no PostgreSQL server; an in-memory SQLite engine is enough to import the backend
+os.environ.setdefault("DATABASE_URL", "sqlite://")
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import argparse
+import json
+import re
+import time
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+N_FEATURES = 2 ** 18
+
+# Stateless: hashed character n-grams need no fitted vocabulary
+vectorizer = HashingVectorizer(
+    analyzer="char_wb",
+    ngram_range=(3, 5),
+    n_features=N_FEATURES,
+    alternate_sign=False
+)
+
+# Reference numbers, dates and card suffixes carry no category signal
+_DIGITS = re.compile(r"\d+")
+
+def featurize(descriptions):
+    """
+    Hashes each distinct normalized description once and scatters the rows
+    back, since statement batches repeat the same merchants heavily.
+    """
+    normalized = [_DIGITS.sub(" ", (d or "").lower()) for d in descriptions]
+    codes, uniques = pd.factorize(pd.Series(normalized, dtype=object))
+    return vectorizer.transform(uniques)[codes]
+
+def fit_full(descriptions, labels):
+    """
+    Trains a fresh linear model on all labelled descriptions. Weights are
+    kept sparse: only hashed n-grams seen in training are nonzero, a small
+    fraction of the dense classes x N_FEATURES matrix.
+    """
+    model = SGDClassifier(loss="log_loss", alpha=1e-6, max_iter=20, tol=None, random_state=0)
+    model.fit(featurize(descriptions), labels)
+    return model.sparsify()
+
+def fit_incremental(model, descriptions, labels):
+    """
+    Updates an existing model with new samples. Labels must be known classes.
+    """
+    model.densify()
+    model.partial_fit(featurize(descriptions), labels)
+    return model.sparsify()
+
+def model_nbytes(model):
+    coef = model.coef_
+    if sparse.issparse(coef):
+        size = coef.data.nbytes + coef.indices.nbytes + coef.indptr.nbytes
+    else:
+        size = coef.nbytes
+    return size + model.intercept_.nbytes
+
+def predict(model, descriptions, min_confidence=0.0):
+    """
+    Predicts a whole batch in one call. Returns (labels, confident mask).
+    """
+    proba = model.predict_proba(featurize(descriptions))
+    best = proba.argmax(axis=1)
+    confident = proba[np.arange(len(best)), best] >= min_confidence
+    return model.classes_[best], confident
+
+_PREFIXES = ["POS", "DEBIT CARD PURCHASE", "ACH", "CONTACTLESS", "ONLINE PMT"]
+
+def _word(rng, length):
+    return "".join(rng.choice(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"), length))
+
+def _synthetic(n, rng, merchants, cities):
+    """
+    Bank-style descriptions: prefix, merchant, store number, city, card ref.
+    """
+    labels = rng.integers(0, len(merchants), n)
+    picks = rng.integers(0, len(merchants[0]), n)
+    prefixes = rng.integers(0, len(_PREFIXES), n)
+    places = rng.integers(0, len(cities), n)
+    refs = rng.integers(0, 10 ** 6, n)
+    descriptions = [
+        f"{_PREFIXES[p]} {merchants[c][m].upper()} #{r % 997} {cities[t]} CARD {r % 9999:04d}"
+        for c, m, p, t, r in zip(labels.tolist(), picks.tolist(), prefixes.tolist(), places.tolist(), refs.tolist())
+    ]
+    return descriptions, labels
+
+def benchmark(train_rows, predict_rows):
+    rng = np.random.default_rng(0)
+    # 12 categories x 40 merchants
+    merchants = [[f"{_word(rng, 7)} {_word(rng, 4)}" for _ in range(40)] for _ in range(12)]
+    cities = [_word(rng, 8) for _ in range(100)]
+    # Held-out cities so accuracy measures generalization, not memorization
+    train_desc, train_labels = _synthetic(train_rows, rng, merchants, cities[:50])
+    test_desc, test_labels = _synthetic(predict_rows, rng, merchants, cities[50:])
+
+    start = time.perf_counter()
+    model = fit_full(train_desc, train_labels)
+    train_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    labels, _ = predict(model, test_desc)
+    predict_seconds = time.perf_counter() - start
+
+    return {
+        "train_rows": train_rows,
+        "predict_rows": predict_rows,
+        "train_seconds": train_seconds,
+        "predictions_per_second": predict_rows / predict_seconds,
+        "model_bytes": model_nbytes(model),
+        "accuracy": float((labels == test_labels).mean())
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--train", type=int, default=100_000, help="Labelled descriptions to train on")
+    parser.add_argument("--predict", type=int, default=1_000_000, help="Descriptions to predict")
+    args = parser.parse_args()
+
+    print(json.dumps(benchmark(args.train, args.predict)))
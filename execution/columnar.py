@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import argparse
+import json
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+class Columns:
+    """
+    One user's transactions as compact parallel arrays:
+    int64 ids, int64 cents, int32 days since epoch and int32 category ids.
+    Appended rows whose database id is unknown carry id -1.
+    """
+    __slots__ = ("ids", "cents", "days", "category_ids")
+
+    def __init__(self, ids, cents, days, category_ids):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.cents = np.asarray(cents, dtype=np.int64)
+        self.days = np.asarray(days, dtype=np.int32)
+        self.category_ids = np.asarray(category_ids, dtype=np.int32)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Builds columns from (id, cents, date, category_id) tuples.
+        """
+        if not rows:
+            return cls([], [], [], [])
+        ids, cents, dates, category_ids = zip(*rows)
+        days = np.array(dates, dtype="datetime64[D]").astype(np.int64)
+        return cls(ids, cents, days, category_ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        return self.ids.nbytes + self.cents.nbytes + self.days.nbytes + self.category_ids.nbytes
+
+    def append(self, other):
+        self.ids = np.concatenate([self.ids, other.ids])
+        self.cents = np.concatenate([self.cents, other.cents])
+        self.days = np.concatenate([self.days, other.days])
+        self.category_ids = np.concatenate([self.category_ids, other.category_ids])
+
+    def delete(self, transaction_id):
+        """
+        Drops a row by database id. Returns False if the id is not held.
+        """
+        keep = self.ids != transaction_id
+        if keep.all():
+            return False
+        self.ids = self.ids[keep]
+        self.cents = self.cents[keep]
+        self.days = self.days[keep]
+        self.category_ids = self.category_ids[keep]
+        return True
+
+    def month_index(self):
+        """
+        Months since year 0 (year * 12 + month - 1) for every row.
+        """
+        return self.days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64) + 1970 * 12
+
+def month_label(index):
+    return date(int(index) // 12, int(index) % 12 + 1, 1).strftime('%b %Y')
+
+def monthly_totals(month_idx, amounts):
+    """
+    Totals per calendar month from the first to the last month present,
+    with empty months filled with zero. Returns (first month index, totals).
+    """
+    if not len(month_idx):
+        return 0, np.array([])
+    first = int(month_idx.min())
+    return first, np.bincount(month_idx - first, weights=amounts)
+
+def sum_by(keys, amounts):
+    """
+    Sums amounts per distinct key. Returns {key: total}.
+    """
+    if not len(keys):
+        return {}
+    if keys.min() >= 0 and keys.max() < 2 ** 20:
+        # Small non-negative ids (categories) index a bincount directly, no sort
+        present = np.flatnonzero(np.bincount(keys))
+        totals = np.bincount(keys, weights=amounts)
+        return dict(zip(present.tolist(), totals[present].tolist()))
+    uniques, codes = np.unique(keys, return_inverse=True)
+    return dict(zip(uniques.tolist(), np.bincount(codes, weights=amounts).tolist()))
+
+def benchmark(rows, categories):
+    rng = np.random.default_rng(0)
+    start_day = date(2015, 1, 1)
+    tuples = [
+        (i, int(c), start_day + timedelta(days=int(d)), int(k))
+        for i, (c, d, k) in enumerate(zip(
+            rng.integers(-50000, 50000, rows).tolist(),
+            rng.integers(0, 3650, rows).tolist(),
+            rng.integers(1, categories + 1, rows).tolist()
+        ))
+    ]
+
+    start = time.perf_counter()
+    columns = Columns.from_rows(tuples)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first, totals = monthly_totals(columns.month_index(), columns.cents / 100)
+    by_category = sum_by(columns.category_ids, columns.cents / 100)
+    columnar_ms = (time.perf_counter() - start) * 1000
+
+    # Baseline: the DataFrame-from-objects path the analytics routes used
+    records = [(d, Decimal(c) / 100) for _, c, d, _ in tuples]
+    start = time.perf_counter()
+    df = pd.DataFrame([{"date": d, "amount": float(a)} for d, a in records])
+    df['date'] = pd.to_datetime(df['date'])
+    df.resample('ME', on='date')['amount'].sum()
+    pandas_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "rows": rows,
+        "bytes_per_row": columns.nbytes / rows,
+        "mb_per_million_rows": columns.nbytes / rows * 1_000_000 / 2 ** 20,
+        "load_seconds": load_seconds,
+        "columnar_trends_and_summary_ms": columnar_ms,
+        "pandas_trends_ms": pandas_ms,
+        "months": len(totals),
+        "categories": len(by_category)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Transactions for one user")
+    parser.add_argument("--categories", type=int, default=20, help="Distinct categories")
+    args = parser.parse_args()
+
+    print(json.dumps(benchmark(args.rows, args.categories)))
@@ -0,0 +1,98 @@
+import numpy as np
+import argparse
+import json
+import time
+
+def welford_add(count, mean, m2, x):
+    """
+    Adds one sample to running (count, mean, M2) statistics in O(1).
+    """
+    count += 1
+    delta = x - mean
+    mean += delta / count
+    m2 += delta * (x - mean)
+    return count, mean, m2
+
+def welford_remove(count, mean, m2, x):
+    """
+    Removes one previously added sample from running statistics in O(1).
+    """
+    if count <= 1:
+        return 0, 0.0, 0.0
+    new_mean = (count * mean - x) / (count - 1)
+    m2 -= (x - mean) * (x - new_mean)
+    return count - 1, new_mean, max(m2, 0.0)
+
+def combine(count_a, mean_a, m2_a, count_b, mean_b, m2_b):
+    """
+    Merges two sets of running statistics (Chan et al. parallel update).
+    Works element-wise on NumPy arrays as well as on scalars.
+    """
+    count = count_a + count_b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = mean_b - mean_a
+        mean = np.where(count > 0, mean_a + delta * count_b / np.maximum(count, 1), 0.0)
+        m2 = m2_a + m2_b + delta ** 2 * count_a * count_b / np.maximum(count, 1)
+    return count, mean, m2
+
+def grouped_stats(codes, values, n_groups):
+    """
+    Vectorized (count, mean, M2) per group for integer group codes.
+    """
+    counts = np.bincount(codes, minlength=n_groups)
+    sums = np.bincount(codes, weights=values, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(counts > 0, sums / np.maximum(counts, 1), 0.0)
+    m2 = np.bincount(codes, weights=(values - means[codes]) ** 2, minlength=n_groups)
+    return counts, means, m2
+
+def variance(count, m2):
+    return m2 / (count - 1) if count > 1 else 0.0
+
+def benchmark(rows, groups, updates):
+    """
+    Compares keeping statistics current with O(1) updates against
+    recomputing them from the full history after every new transaction.
+    """
+    rng = np.random.default_rng(0)
+    codes = rng.integers(0, groups, rows)
+    values = rng.gamma(2.0, 40.0, rows)
+
+    start = time.perf_counter()
+    counts, means, m2 = grouped_stats(codes, values, groups)
+    full_recompute = time.perf_counter() - start
+
+    state = [[int(c), float(m), float(s)] for c, m, s in zip(counts, means, m2)]
+    new_codes = rng.integers(0, groups, updates)
+    new_values = rng.gamma(2.0, 40.0, updates)
+    start = time.perf_counter()
+    for code, x in zip(new_codes.tolist(), new_values.tolist()):
+        state[code] = list(welford_add(*state[code], x))
+    incremental = (time.perf_counter() - start) / updates
+
+    # Sanity check: incremental state matches a recompute over all rows
+    all_codes = np.r_[codes, new_codes]
+    all_values = np.r_[values, new_values]
+    _, check_means, check_m2 = grouped_stats(all_codes, all_values, groups)
+    max_error = max(
+        float(np.max(np.abs(check_means - [s[1] for s in state]))),
+        float(np.max(np.abs(check_m2 - [s[2] for s in state]) / np.maximum(check_m2, 1)))
+    )
+
+    return {
+        "rows": rows,
+        "groups": groups,
+        "full_recompute_ms": full_recompute * 1000,
+        "incremental_update_us": incremental * 1e6,
+        "speedup_per_transaction": full_recompute / incremental,
+        "max_relative_error": max_error
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000, help="History size")
+    parser.add_argument("--groups", type=int, default=1000, help="Number of (user, category) groups")
+    parser.add_argument("--updates", type=int, default=100_000, help="Incremental updates to time")
+    args = parser.parse_args()
+
+    print(json.dumps(benchmark(args.rows, args.groups, args.updates)))
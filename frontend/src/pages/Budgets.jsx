@@ -78,30 +78,28 @@ const Budgets = () => {
         }
     };
 
-    // Poll report status
+    // Subscribe to pushed report status
     useEffect(() => {
         if (!reportTaskId) return;
 
-        const interval = setInterval(async () => {
-            try {
-                const res = await axios.get(`/reports/status/${reportTaskId}`);
-                if (res.data.task_status === 'SUCCESS' || res.data.task_status === 'completed') {
-                    setReportFile(res.data.result.filename);
-                    setReportTaskId(null);
-                    setReportLoading(false);
-                    clearInterval(interval);
-                } else if (res.data.task_status === 'FAILURE') {
-                    alert("Background task failed");
-                    setReportTaskId(null);
-                    setReportLoading(false);
-                    clearInterval(interval);
-                }
-            } catch (err) {
-                console.error("Status check failed", err);
+        const events = new EventSource(`/reports/events/${reportTaskId}`);
+        events.onmessage = (e) => {
+            const data = JSON.parse(e.data);
+            if (data.task_status === 'SUCCESS') {
+                setReportFile(data.result.filename);
+                setReportTaskId(null);
+                setReportLoading(false);
+                events.close();
+            } else if (data.task_status === 'FAILURE') {
+                alert("Background task failed");
+                setReportTaskId(null);
+                setReportLoading(false);
+                events.close();
             }
-        }, 2000);
+        };
+        events.onerror = () => console.error("Status stream interrupted, reconnecting");
 
-        return () => clearInterval(interval);
+        return () => events.close();
     }, [reportTaskId]);
 
     const handleDownload = () => {
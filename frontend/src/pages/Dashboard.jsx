@@ -44,14 +44,11 @@ const Dashboard = () => {
     useEffect(() => {
         const fetchData = async () => {
             try {
-                const [trendsRes, forecastRes, summaryRes] = await Promise.all([
-                    axios.get('/analytics/trends'),
-                    axios.get('/analytics/forecast'),
-                    axios.get(`/transactions/summary?start_date=${new Date(new Date().getFullYear(), new Date().getMonth(), 1).toISOString().split('T')[0]}&end_date=${new Date().toISOString().split('T')[0]}`)
-                ]);
-                setTrends(trendsRes.data);
-                setForecast(forecastRes.data);
-                setSummary(summaryRes.data);
+                // Single snapshot request replaces the per-panel fan-out
+                const res = await axios.get('/analytics/dashboard');
+                setTrends(res.data.trends);
+                setForecast(res.data.forecast);
+                setSummary(res.data.summary);
             } catch (err) {
                 console.error("Dashboard data fetch failed", err);
             } finally {
@@ -44,11 +44,11 @@ const Transactions = () => {
     };
 
     const handleFileUpload = async (e) => {
-        const file = e.target.files[0];
-        if (!file) return;
+        const files = Array.from(e.target.files);
+        if (files.length === 0) return;
 
         const formData = new FormData();
-        formData.append('file', file);
+        files.forEach(file => formData.append('files', file));
 
         setUploading(true);
         try {
@@ -85,6 +85,15 @@ const Transactions = () => {
         }
     };
 
+    const handleRecategorize = async (id, categoryId) => {
+        try {
+            await axios.patch(`/transactions/${id}`, { category_id: categoryId });
+            fetchData();
+        } catch (err) {
+            alert("Update failed");
+        }
+    };
+
     const filteredTransactions = transactions.filter(tx =>
         tx.description?.toLowerCase().includes(search.toLowerCase()) ||
         categories.find(c => c.id === tx.category_id)?.name.toLowerCase().includes(search.toLowerCase())
@@ -102,7 +111,7 @@ const Transactions = () => {
                     <label className="btn-secondary cursor-pointer flex items-center space-x-2 text-sm py-2">
                         {uploading ? <Loader2 size={16} className="animate-spin" /> : <Upload size={16} />}
                         <span>{uploading ? 'Processing...' : 'Upload CSV'}</span>
-                        <input type="file" className="hidden" accept=".csv" onChange={handleFileUpload} disabled={uploading} />
+                        <input type="file" className="hidden" accept=".csv,.zip" multiple onChange={handleFileUpload} disabled={uploading} />
                     </label>
                     <button
                         onClick={() => setShowAdd(!showAdd)}
@@ -208,9 +217,15 @@ const Transactions = () => {
                                     </td>
                                     <td className="px-6 py-4 text-sm font-medium">{tx.description}</td>
                                     <td className="px-6 py-4">
-                                        <span className="inline-flex items-center px-2 py-0.5 rounded-sm text-[10px] font-bold uppercase tracking-tighter bg-primary/10 text-primary border border-primary/20">
-                                            {categories.find(c => c.id === tx.category_id)?.name || 'Uncategorized'}
-                                        </span>
+                                        <select
+                                            value={tx.category_id}
+                                            onChange={e => handleRecategorize(tx.id, Number(e.target.value))}
+                                            className="px-2 py-0.5 rounded-sm text-[10px] font-bold uppercase tracking-tighter bg-primary/10 text-primary border border-primary/20 outline-none cursor-pointer"
+                                        >
+                                            {categories.map(c => (
+                                                <option key={c.id} value={c.id} className="bg-surface">{c.name}</option>
+                                            ))}
+                                        </select>
                                     </td>
                                     <td className="px-6 py-4 text-sm font-mono text-right font-bold text-text-primary">
                                         ${parseFloat(tx.amount).toFixed(2)}
@@ -12,7 +12,8 @@ export default defineConfig({
             '/transactions': 'http://localhost:8000',
             '/budgets': 'http://localhost:8000',
             '/analytics': 'http://localhost:8000',
-            '/reports': 'http://localhost:8000'
+            '/reports': 'http://localhost:8000',
+            '/jobs': 'http://localhost:8000'
         }
     }
 })
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from datetime import date
+from types import SimpleNamespace
+import pytest
+from execution.columnar import Columns
+from backend import analytics_store
+
+USER = 1
+
+@pytest.fixture(autouse=True)
+def empty_store(monkeypatch):
+    monkeypatch.setattr(analytics_store, "_entries", OrderedDict())
+    monkeypatch.setattr(analytics_store, "_rows_held", 0)
+
+def _seed(user_version, global_version=0):
+    columns = Columns.from_rows([(1, 500, date(2026, 3, 1), 2), (2, 700, date(2026, 3, 2), 2)])
+    analytics_store._entries[USER] = [columns, (user_version, global_version)]
+    analytics_store._rows_held = len(columns)
+    return columns
+
+def _transaction(id, category_id=2):
+    return SimpleNamespace(id=id, amount="12.34", date=date(2026, 3, 5), category_id=category_id)
+
+def test_append_with_next_version():
+    _seed(4, 9)
+    analytics_store.append(USER, [_transaction(3)], 5)
+    columns, versions = analytics_store._entries[USER]
+    assert versions == (5, 9)
+    assert columns.ids.tolist() == [1, 2, 3]
+    assert columns.cents.tolist()[-1] == 1234
+    assert analytics_store._rows_held == 3
+
+def test_delete_with_next_version():
+    _seed(4)
+    analytics_store.delete(USER, 1, 5)
+    columns, versions = analytics_store._entries[USER]
+    assert versions == (5, 0)
+    assert columns.ids.tolist() == [2]
+    assert analytics_store._rows_held == 1
+
+def test_replace_moves_category():
+    _seed(4)
+    analytics_store.replace(USER, _transaction(1, category_id=8), 5)
+    columns, _ = analytics_store._entries[USER]
+    assert sorted(zip(columns.ids.tolist(), columns.category_ids.tolist())) == [(1, 8), (2, 2)]
+    assert analytics_store._rows_held == 2
+
+@pytest.mark.parametrize("version", [None, 4, 6])
+def test_version_gap_drops_entry(version):
+    # None: Redis unreachable; 4: stale; 6: another process wrote in between
+    _seed(4)
+    analytics_store.append(USER, [_transaction(3)], version)
+    assert USER not in analytics_store._entries
+    assert analytics_store._rows_held == 0
+
+def test_unknown_id_drops_entry():
+    _seed(4)
+    analytics_store.delete(USER, 42, 5)
+    assert USER not in analytics_store._entries
+
+def test_touch_only_advances_version():
+    columns = _seed(4)
+    analytics_store.touch(USER, 5)
+    assert analytics_store._entries[USER] == [columns, (5, 0)]
+
+def test_unloaded_user_is_ignored():
+    analytics_store.append(USER, [_transaction(3)], 1)
+    assert not analytics_store._entries
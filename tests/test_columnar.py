@@ -0,0 +1,64 @@
+import numpy as np
+from datetime import date
+from execution.columnar import Columns, monthly_totals, sum_by
+
+def _columns():
+    return Columns.from_rows([
+        (1, 1250, date(2026, 1, 31), 3),
+        (2, -400, date(2026, 2, 1), 5),
+        (3, 999, date(2026, 4, 15), 3),
+    ])
+
+def test_from_rows_packs_columns():
+    columns = _columns()
+    assert len(columns) == 3
+    assert columns.ids.tolist() == [1, 2, 3]
+    assert columns.days.dtype == np.int32
+    assert columns.days.astype("datetime64[D]")[0] == np.datetime64("2026-01-31")
+    assert columns.nbytes == 3 * (8 + 8 + 4 + 4)
+
+def test_from_rows_empty():
+    columns = Columns.from_rows([])
+    assert len(columns) == 0
+    assert len(columns.month_index()) == 0
+
+def test_append_concatenates():
+    columns = _columns()
+    columns.append(Columns.from_rows([(-1, 100, date(2026, 5, 1), 7)]))
+    assert columns.ids.tolist() == [1, 2, 3, -1]
+    assert columns.cents.tolist() == [1250, -400, 999, 100]
+    assert columns.category_ids.tolist() == [3, 5, 3, 7]
+
+def test_append_does_not_mutate_snapshots():
+    columns = _columns()
+    snapshot = Columns(columns.ids, columns.cents, columns.days, columns.category_ids)
+    columns.append(Columns.from_rows([(4, 1, date(2026, 5, 1), 3)]))
+    columns.delete(1)
+    assert snapshot.ids.tolist() == [1, 2, 3]
+
+def test_delete_removes_row():
+    columns = _columns()
+    assert columns.delete(2)
+    assert columns.ids.tolist() == [1, 3]
+    assert columns.cents.tolist() == [1250, 999]
+    assert columns.category_ids.tolist() == [3, 3]
+
+def test_delete_missing_id():
+    columns = _columns()
+    assert not columns.delete(42)
+    assert len(columns) == 3
+
+def test_month_index_and_totals():
+    columns = _columns()
+    month_idx = columns.month_index()
+    assert month_idx.tolist() == [2026 * 12, 2026 * 12 + 1, 2026 * 12 + 3]
+    first, totals = monthly_totals(month_idx, columns.cents / 100)
+    assert first == 2026 * 12
+    # March has no rows and is filled with zero
+    np.testing.assert_allclose(totals, [12.5, -4.0, 0.0, 9.99])
+
+def test_sum_by_small_and_large_keys():
+    amounts = np.array([1.0, 2.0, 3.0, 4.0])
+    assert sum_by(np.array([3, 5, 3, 0]), amounts) == {0: 4.0, 3: 4.0, 5: 2.0}
+    assert sum_by(np.array([2 ** 40, -1, 2 ** 40, -1]), amounts) == {-1: 6.0, 2 ** 40: 4.0}
+    assert sum_by(np.array([], dtype=np.int64), np.array([])) == {}
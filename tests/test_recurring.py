@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+import numpy as np
+from backend.recurring import group_keys, detect_recurring, normalize_description, CADENCES
+
+MONTHLY = [i for i, c in enumerate(CADENCES) if c[0] == "monthly"][0]
+WEEKLY = [i for i, c in enumerate(CADENCES) if c[0] == "weekly"][0]
+YEARLY = [i for i, c in enumerate(CADENCES) if c[0] == "yearly"][0]
+
+def _days(*dates):
+    return np.array(dates, dtype="datetime64[D]").astype(np.int64)
+
+def _detect(descriptions, amounts, days, user_ids=None):
+    n = len(descriptions)
+    user_ids = np.ones(n, dtype=np.int64) if user_ids is None else np.asarray(user_ids, dtype=np.int64)
+    keys = group_keys(user_ids, descriptions, np.asarray(amounts, dtype=np.float64))
+    return keys, detect_recurring(keys, np.asarray(days))
+
+def _monthly_dates(start, n):
+    return [date(start.year + (start.month - 1 + i) // 12, (start.month - 1 + i) % 12 + 1, start.day) for i in range(n)]
+
+def test_normalize_description_strips_reference_numbers():
+    assert normalize_description("NETFLIX.COM 4829-11 #993") == normalize_description("Netflix.com 1120-07 #12")
+    assert normalize_description(None) == ""
+
+def test_detects_cadences():
+    weekly = [date(2026, 1, 5) + timedelta(days=7 * i) for i in range(6)]
+    yearly = [date(2020 + i, 3, 1) for i in range(4)]
+    monthly = _monthly_dates(date(2025, 1, 15), 6)
+    descriptions = ["GYM"] * 6 + ["DOMAIN RENEWAL"] * 4 + ["NETFLIX"] * 6
+    amounts = [12.0] * 6 + [20.0] * 4 + [15.99] * 6
+    keys, result = _detect(descriptions, amounts, _days(*weekly, *yearly, *monthly))
+
+    cadence_of_row = result["cadence"][result["group_of_row"]]
+    assert (cadence_of_row[:6] == WEEKLY).all()
+    assert (cadence_of_row[6:10] == YEARLY).all()
+    assert (cadence_of_row[10:] == MONTHLY).all()
+
+def test_needs_min_occurrences():
+    _, result = _detect(["NETFLIX"] * 2, [15.99] * 2, _days(date(2026, 1, 1), date(2026, 2, 1)))
+    assert (result["cadence"] == -1).all()
+
+def test_irregular_gaps_are_not_recurring():
+    days = _days(date(2026, 1, 1), date(2026, 1, 3), date(2026, 2, 20), date(2026, 3, 1), date(2026, 5, 30))
+    _, result = _detect(["COFFEE"] * 5, [4.5] * 5, days)
+    assert (result["cadence"] == -1).all()
+
+def test_amounts_near_each_other_share_a_group():
+    # 16.30 and 16.45 straddled a fixed log band edge
+    amounts = [16.30, 16.45, 16.30, 16.45, 16.38]
+    keys, result = _detect(["POWER CO"] * 5, amounts, _days(*_monthly_dates(date(2026, 1, 10), 5)))
+    assert len(np.unique(keys)) == 1
+    assert result["cadence"][0] == MONTHLY
+
+def test_different_amounts_signs_and_users_are_split():
+    keys, _ = _detect(["SPOTIFY"] * 4, [9.99, 9.99, 29.99, -9.99], _days(*_monthly_dates(date(2026, 1, 1), 4)))
+    assert keys[0] == keys[1]
+    assert len({keys[1], keys[2], keys[3]}) == 3
+    keys, _ = _detect(["SPOTIFY"] * 2, [9.99, 9.99], _days(date(2026, 1, 1), date(2026, 2, 1)), user_ids=[1, 2])
+    assert keys[0] != keys[1]
+
+def test_same_day_duplicates_do_not_break_cadence():
+    # The same statement imported twice
+    dates = _monthly_dates(date(2025, 6, 1), 5)
+    _, result = _detect(["NETFLIX"] * 10, [15.99] * 10, _days(*dates, *dates))
+    assert result["cadence"][0] == MONTHLY
+    assert result["occurrences"][0] == 5
+
+def test_last_row_is_latest_occurrence():
+    dates = _monthly_dates(date(2025, 6, 1), 4)
+    shuffled = [dates[2], dates[0], dates[3], dates[1]]
+    _, result = _detect(["NETFLIX"] * 4, [15.99] * 4, _days(*shuffled))
+    assert result["last_row"][0] == 2
+
+def test_empty_input():
+    _, result = _detect([], [], np.zeros(0, dtype=np.int64))
+    assert len(result["cadence"]) == 0
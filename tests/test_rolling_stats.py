@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from execution.rolling_stats import welford_add, welford_remove, combine, grouped_stats, variance
+
+def _stats(values):
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return 0, 0.0, 0.0
+    return len(values), values.mean(), ((values - values.mean()) ** 2).sum()
+
+def _fold(values):
+    state = (0, 0.0, 0.0)
+    for x in values:
+        state = welford_add(*state, x)
+    return state
+
+def test_welford_add_matches_numpy():
+    values = np.random.default_rng(0).gamma(2.0, 40.0, 1000)
+    count, mean, m2 = _fold(values)
+    assert count == 1000
+    assert mean == pytest.approx(values.mean())
+    assert m2 == pytest.approx(((values - values.mean()) ** 2).sum())
+    assert variance(count, m2) == pytest.approx(values.var(ddof=1))
+
+def test_welford_remove_matches_numpy():
+    values = np.random.default_rng(1).normal(50.0, 10.0, 200)
+    state = _fold(values)
+    for i in [0, 17, 199, 50]:
+        state = welford_remove(*state, values[i])
+    rest = np.delete(values, [0, 17, 199, 50])
+    expected = _stats(rest)
+    assert state[0] == expected[0]
+    assert state[1] == pytest.approx(expected[1])
+    assert state[2] == pytest.approx(expected[2])
+
+def test_welford_remove_down_to_empty():
+    state = _fold([5.0, 7.0])
+    state = welford_remove(*state, 5.0)
+    assert state == pytest.approx((1, 7.0, 0.0))
+    assert welford_remove(*state, 7.0) == (0, 0.0, 0.0)
+
+def test_welford_remove_never_goes_negative():
+    state = _fold([100.0] * 5)
+    for _ in range(4):
+        state = welford_remove(*state, 100.0)
+        assert state[2] >= 0.0
+
+def test_combine_matches_numpy():
+    rng = np.random.default_rng(2)
+    a, b = rng.normal(10, 3, 300), rng.normal(40, 8, 50)
+    merged = combine(*_stats(a), *_stats(b))
+    expected = _stats(np.r_[a, b])
+    assert merged[0] == expected[0]
+    assert float(merged[1]) == pytest.approx(expected[1])
+    assert float(merged[2]) == pytest.approx(expected[2])
+
+def test_combine_with_empty_side():
+    values = [3.0, 4.0, 8.0]
+    assert [float(v) for v in combine(0, 0.0, 0.0, *_stats(values))] == pytest.approx(list(_stats(values)))
+    assert [float(v) for v in combine(*_stats(values), 0, 0.0, 0.0)] == pytest.approx(list(_stats(values)))
+    assert [float(v) for v in combine(0, 0.0, 0.0, 0, 0.0, 0.0)] == [0.0, 0.0, 0.0]
+
+def test_combine_elementwise_on_arrays():
+    rng = np.random.default_rng(3)
+    groups = [(rng.normal(0, 1, 20), rng.normal(5, 2, 7)), (rng.normal(9, 1, 1), rng.normal(1, 1, 30))]
+    left = np.array([_stats(a) for a, _ in groups]).T
+    right = np.array([_stats(b) for _, b in groups]).T
+    count, mean, m2 = combine(*left, *right)
+    for i, (a, b) in enumerate(groups):
+        expected = _stats(np.r_[a, b])
+        assert count[i] == expected[0]
+        assert mean[i] == pytest.approx(expected[1])
+        assert m2[i] == pytest.approx(expected[2])
+
+def test_grouped_stats_matches_per_group_numpy():
+    rng = np.random.default_rng(4)
+    codes = rng.integers(0, 5, 500)
+    values = rng.gamma(2.0, 40.0, 500)
+    # Group 5 has no rows
+    counts, means, m2 = grouped_stats(codes, values, 6)
+    for group in range(6):
+        expected = _stats(values[codes == group])
+        assert counts[group] == expected[0]
+        assert means[group] == pytest.approx(expected[1])
+        assert m2[group] == pytest.approx(expected[2])
+
+def test_variance_of_single_sample_is_zero():
+    assert variance(1, 0.0) == 0.0
+    assert variance(0, 0.0) == 0.0